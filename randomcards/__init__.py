@@ -0,0 +1,10 @@
+# RandomCards: random cards, assembled from the words in the CSV files,
+# and battles fought with them.
+#
+#     core        Card, Player, CardMakerRandom() and the content tables
+#     engine      Battle and simulateBattle(), no window needed
+#     gui         the tkinter window (the only module that imports tkinter)
+#
+# The tools (tournament, balance, battlelog, bench, ...) sit next to
+# these. Importing the package itself loads nothing, so each tool only
+# pays for the modules it uses.
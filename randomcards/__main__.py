@@ -0,0 +1,37 @@
+# The command line:
+#     python -m randomcards play                    # open the game window
+#     python -m randomcards simulate --battles 1000 # headless tournament
+#     python -m randomcards bench                   # timing benchmarks
+#     python -m randomcards serve --port 7777       # match server
+#
+# Everything after the command goes to that command's own options (see
+# tournament.py, bench.py and server.py). Modules are only imported for
+# the command that runs, so only play loads tkinter.
+
+import argparse
+import sys
+
+COMMANDS = ("play", "simulate", "bench", "serve")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m randomcards", description="Play RandomCards, or run battles without a window.")
+    parser.add_argument("command", choices=COMMANDS, help="play: open the game window; simulate: run many headless battles; bench: time the engine; serve: host battles over a socket")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help="options for the command (try COMMAND --help)")
+    args = parser.parse_args(argv)
+
+    if args.command == "play":
+        from randomcards import gui
+        gui.launch()
+        return 0
+    if args.command == "simulate":
+        from randomcards import tournament
+        return tournament.main(args.args)
+    if args.command == "bench":
+        from randomcards import bench
+        return bench.main(args.args)
+    from randomcards import server
+    return server.main(args.args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
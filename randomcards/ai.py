@@ -0,0 +1,245 @@
+# A computer opponent that thinks about the hand it was dealt.
+#
+# SearchPolicy is a policy (see engine.py) that looks at every order
+# the cards in hand could be played in, and at stopping early, and picks the
+# line that looks best once the other side has had its reply turn. The
+# reply is random, so it is estimated by playing out a number of random
+# reply turns (an expectimax chance node, sampled).
+#
+# The search has a time budget per move. It first searches with a quick
+# static evaluation, then keeps redoing the search with twice as many
+# sampled replies until time runs out, and uses the last one that finished.
+# Positions that come up more than once (different orders often end in the
+# same numbers) are looked up in a transposition table keyed on the
+# players' stateKey()s instead of being searched again.
+#
+# While it has a job (a gui.WorkerJob, or anything with cancelled() and
+# report()), it stops as soon as the job is cancelled, and reports how far
+# it has got after each card it has finished looking at.
+
+import random
+import time
+
+from randomcards import core
+
+# Scores far beyond anything evaluate() can return
+WIN = 1000000.0
+LOSS = -WIN
+
+def playerScore(player):
+    # How good a player's numbers look. Running out of health, energy, or
+    # deck loses, so those count the most, and deck and energy are small
+    # numbers to begin with.
+    return (player.health + 3.0 * player.energy + 6.0 * player.deck
+        + 2.0 * player.buff_damage + player.buff_defense + player.buff_healing
+        + 0.5 * (player.buff_energy + player.buff_deck)
+        + 0.5 * player.defense + 0.5 * player.energy_current)
+
+def evaluate(user, target):
+    # Static evaluation from user's point of view
+    return playerScore(user) - playerScore(target)
+
+
+class SearchPolicy:
+    # time_budget: seconds to think per card, or None to always do exactly
+    # max_samples sampled replies (slower, but the same every time for a
+    # given rng, which is what batch runs want).
+    # max_samples: most reply turns to sample for each end-of-turn position.
+    # max_table_size: the transposition table is cleared when it gets this big.
+    def __init__(self, time_budget=0.05, max_samples=32, rng=None, max_table_size=200000):
+        self.time_budget = time_budget
+        self.max_samples = max_samples
+        # Sampling uses its own random numbers, so thinking never changes
+        # which cards the battle deals next.
+        self.rng = rng if rng is not None else random.Random()
+        self.max_table_size = max_table_size
+
+        self.table = {} # (position key, samples) -> value
+        self.replies = [] # Sampled reply hands, the same for every position
+        self.deadline = None
+        self.last_samples = 0 # How many samples the last decision got to
+        self.hand = None # The hand being played, to notice when a turn is over
+        self.job = None # Set by whoever runs the search on a worker thread
+
+    def __call__(self, hand, user, target):
+        if hand is not self.hand:
+            # A fresh hand means a new turn
+            self.newTurn()
+            self.hand = hand
+        if len(self.table) > self.max_table_size:
+            self.table.clear()
+
+        if self.time_budget is None:
+            self.deadline = None
+            return self.search(hand, user, target, self.max_samples)[1]
+
+        # Anytime search: keep the answer from the last search that finished.
+        # If even the quick one can't finish in time, just look one card ahead.
+        self.deadline = time.perf_counter() + self.time_budget
+        try:
+            best = self.search(hand, user, target, 0)[1]
+        except TimeoutError:
+            return self.greedy(hand, user, target)
+        self.last_samples = 0
+        samples = 1
+        while samples <= self.max_samples:
+            try:
+                best = self.search(hand, user, target, samples)[1]
+            except TimeoutError:
+                break
+            self.last_samples = samples
+            samples *= 2
+        return best
+
+    def greedy(self, hand, user, target):
+        # The card that looks best right after playing it, or None if
+        # stopping looks better than all of them.
+        user = user.clone()
+        target = target.clone()
+        user_state = user.snapshot()
+        target_state = target.snapshot()
+        best_value = WIN if target.isDefeated() else evaluate(user, target)
+        best_index = None
+        for i, card in enumerate(hand):
+            card.play(user, target)
+            user.energy_current -= card.cost
+            value = WIN if target.isDefeated() else evaluate(user, target)
+            user.restore(user_state)
+            target.restore(target_state)
+            if value > best_value:
+                best_value = value
+                best_index = i
+        return best_index
+
+    def search(self, hand, user, target, samples):
+        # Returns (value, index of the best card to play or None to stop)
+        self.drawReplies(samples, target.deck)
+        ids = tuple(cardKey(card) for card in hand)
+        user = user.clone()
+        target = target.clone()
+
+        # Stopping now is always allowed
+        best_value = self.endOfTurn(user, target, samples)
+        best_index = None
+        user_state = user.snapshot()
+        target_state = target.snapshot()
+        tried = set()
+        for i, card in enumerate(hand):
+            if ids[i] in tried:
+                continue # Same card twice in hand: no need to look at both
+            tried.add(ids[i])
+
+            card.play(user, target)
+            user.energy_current -= card.cost
+            value = self.midTurn(hand, ids, (1 << len(hand)) - 1 & ~(1 << i), user, target, samples)
+            user.restore(user_state)
+            target.restore(target_state)
+
+            if value > best_value:
+                best_value = value
+                best_index = i
+            if self.job is not None:
+                if self.job.cancelled():
+                    raise TimeoutError # Nobody wants the answer any more
+                self.job.report(self.progress(i + 1, len(hand)))
+        return best_value, best_index
+
+    def progress(self, done, cards):
+        # How far along the decision is, from 0 to 1: the share of the
+        # time budget used up, or without one, of the cards looked at
+        if self.deadline is None:
+            return done / cards
+        return min(1.0, 1.0 - (self.deadline - time.perf_counter()) / self.time_budget)
+
+    def midTurn(self, hand, ids, remaining, user, target, samples):
+        # Best value reachable after at least one card has been played this
+        # turn. remaining is a bitmask of the cards still in hand.
+        remaining_ids = tuple(sorted(ids[i] for i in range(len(hand)) if remaining >> i & 1))
+        key = (user.stateKey(), target.stateKey(), remaining_ids, samples)
+        value = self.table.get(key)
+        if value is not None:
+            return value
+
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise TimeoutError
+
+        best_value = self.endOfTurn(user, target, samples)
+        if user.energy_current > 0:
+            user_state = user.snapshot()
+            target_state = target.snapshot()
+            tried = set()
+            for i in range(len(hand)):
+                if not remaining >> i & 1 or ids[i] in tried:
+                    continue
+                tried.add(ids[i])
+
+                card = hand[i]
+                card.play(user, target)
+                user.energy_current -= card.cost
+                value = self.midTurn(hand, ids, remaining & ~(1 << i), user, target, samples)
+                user.restore(user_state)
+                target.restore(target_state)
+                if value > best_value:
+                    best_value = value
+
+        self.table[key] = best_value
+        return best_value
+
+    def endOfTurn(self, user, target, samples):
+        # Value of ending the turn here: a win if the target is beaten,
+        # otherwise the average over the sampled replies.
+        if target.isDefeated():
+            return WIN
+        if samples == 0:
+            return evaluate(user, target)
+
+        key = (user.stateKey(), target.stateKey(), None, samples)
+        value = self.table.get(key)
+        if value is not None:
+            return value
+
+        user_state = user.snapshot()
+        target_state = target.snapshot()
+        total = 0.0
+        for reply in self.replies[:samples]:
+            total += self.reply(reply, user, target)
+            user.restore(user_state)
+            target.restore(target_state)
+        value = total / samples
+        self.table[key] = value
+        return value
+
+    def reply(self, cards, user, target):
+        # Plays out the other side's turn with cards (played in order, the
+        # way playFirstPolicy does) and scores the result for user.
+        target.defense = 0
+        target.energy_current += target.energy
+        for played, card in enumerate(cards[:max(target.deck, 0)]):
+            if played > 0 and target.energy_current <= 0:
+                break
+            card.play(target, user)
+            target.energy_current -= card.cost
+        if user.isDefeated():
+            return LOSS
+        return evaluate(user, target)
+
+    def drawReplies(self, samples, deck):
+        # Make sure there are enough sampled reply hands, and that they're
+        # long enough for a deck a bit bigger than the target's is now.
+        deck = max(deck, 1) + 2
+        while len(self.replies) < samples:
+            self.replies.append([])
+        for reply in self.replies[:samples]:
+            while len(reply) < deck:
+                reply.append(core.CardMakerRandom(self.rng))
+
+    def newTurn(self):
+        # Forget the sampled replies, so every turn is judged against
+        # fresh ones. Positions in the table were valued against the old
+        # replies, so they go too.
+        self.replies = []
+        self.table.clear()
+
+def cardKey(card):
+    # Cards with the same id do exactly the same thing
+    return card.card_id if card.card_id is not None else id(card)
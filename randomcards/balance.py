@@ -0,0 +1,247 @@
+# Balance analytics: which rows of the CSV files win battles?
+#
+# A BalanceStudy runs a numbered batch of headless battles (battle i always
+# uses the random numbers from tournament.battleRandom(seed, i)) and
+# keeps, for every battle, who won and the card ids each side played.
+# From those it works out, for every row of every table, how much more
+# often a side wins when it plays a card using that row than that side
+# usually does.
+#
+# After a designer edits some rows, update() only re-runs the battles that
+# played a card using one of the edited rows. Both sides play their cards
+# in the order they're drawn, so the random numbers pick the same rows
+# as before, and a battle that never played an edited row plays out
+# exactly the same as it did. Only those re-run battles' numbers are taken
+# out of the totals and put back in. Adding or removing rows changes what
+# the random numbers pick, so that re-runs everything.
+#
+# From the command line (runs the study the first time, updates it after):
+#     python -m randomcards.balance --battles 100000 --study balance.bin
+
+import argparse
+import os
+import pickle
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from randomcards import core, engine, streams, tournament
+
+# Values for a battle's winner
+NO_WINNER = 0
+PLAYER_WON = 1
+OPPONENT_WON = 2
+
+SIDES = ("player", "opponent")
+
+
+def recordBattle(seed, index, max_rounds=1000):
+    # Runs battle number index and returns (winner, player card ids,
+    # opponent card ids), with the ids in the order they were played.
+    played = (array("I"), array("I"))
+
+    def recorder(side):
+        def policy(hand, user, target):
+            played[side].append(hand[0].card_id)
+            return 0
+        return policy
+
+    battle = engine.simulateBattle(core.Player(), core.Player(),
+        recorder(0), recorder(1), tournament.battleRandom(seed, index), max_rounds)
+    winner = {"player": PLAYER_WON, "opponent": OPPONENT_WON}.get(battle.winner, NO_WINNER)
+    return winner, played[0], played[1]
+
+def recordBattles(seed, indices, max_rounds=1000):
+    # What each worker process does: {index: record} for the battles asked for
+    return {index: recordBattle(seed, index, max_rounds) for index in indices}
+
+
+class RowImpact:
+    # How one row did across the study.
+    # impact: how much more often (as a fraction) the side that played it
+    # won than that side wins overall. 0.05 means 5 points more.
+    def __init__(self, table, row, text, battles_used, wins, plays, impact):
+        self.table = table # Index into core.SLOTS
+        self.row = row # Row number in that table (0 is the first row after the titles)
+        self.text = text
+        self.battles_used = battles_used # Per side: battles where it was played at least once
+        self.wins = wins # Per side: how many of those that side won
+        self.plays = plays # Per side: how many times it was played in total
+        self.impact = impact
+
+    def __repr__(self):
+        return "%s row %i %r: %+.2f%% over %i battles" % (core.SLOTS[self.table], self.row, self.text, 100.0 * self.impact, sum(self.battles_used))
+
+
+class BalanceStudy:
+    def __init__(self, battles=10000, seed=0, max_rounds=1000):
+        self.battles = battles
+        self.seed = seed
+        self.max_rounds = max_rounds
+        self.tables = None # The content tables the records were made with
+        self.weights = None # Their row weights (see RARITY in core.py)
+        self.stream_version = streams.STREAM_VERSION # And the random numbers
+        self.records = {} # Battle number -> (winner, player ids, opponent ids)
+        self.resetTotals()
+
+    def resetTotals(self):
+        self.side_wins = [0, 0]
+        # Per side, per table, per row
+        self.used = None
+        self.wins = None
+        self.plays = None
+        self.battles_using = {} # (table, row) -> set of battle numbers that played it
+
+    def run(self, workers=1, indices=None):
+        # Runs (or re-runs) battles and folds them into the totals.
+        # indices defaults to every battle.
+        content = core.content_store.refresh()
+        if self.tables is None or indices is None:
+            self.tables = content.tables
+            self.weights = content.weights
+            self.stream_version = streams.STREAM_VERSION
+            self.records = {}
+            self.resetTotals()
+            indices = range(self.battles)
+        if self.used is None:
+            self.used = [[[0] * size for size in content.sizes] for side in SIDES]
+            self.wins = [[[0] * size for size in content.sizes] for side in SIDES]
+            self.plays = [[[0] * size for size in content.sizes] for side in SIDES]
+
+        indices = sorted(indices)
+        if workers <= 1 or len(indices) < 2:
+            fresh = recordBattles(self.seed, indices, self.max_rounds)
+        else:
+            chunk = max(1, len(indices) // (workers * 4))
+            fresh = {}
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(recordBattles, self.seed, indices[i:i + chunk], self.max_rounds) for i in range(0, len(indices), chunk)]
+                for future in futures:
+                    fresh.update(future.result())
+
+        for index in indices:
+            old = self.records.get(index)
+            if old is not None:
+                self.count(index, old, -1)
+            self.records[index] = fresh[index]
+            self.count(index, fresh[index], 1)
+        return len(indices)
+
+    def count(self, index, record, sign):
+        # Adds a battle's record to the totals (sign 1) or takes it out (sign -1)
+        winner, player_ids, opponent_ids = record
+        sizes = tuple(len(table) for table in self.tables)
+        if winner != NO_WINNER:
+            self.side_wins[winner - 1] += sign
+
+        for side, ids in enumerate((player_ids, opponent_ids)):
+            won = winner == side + 1
+            rows_played = {}
+            for card_id in ids:
+                for table, row in enumerate(core.slotsFromCardId(card_id, sizes)):
+                    rows_played[table, row] = rows_played.get((table, row), 0) + 1
+
+            for (table, row), plays in rows_played.items():
+                self.used[side][table][row] += sign
+                self.plays[side][table][row] += sign * plays
+                if won:
+                    self.wins[side][table][row] += sign
+                using = self.battles_using.setdefault((table, row), set())
+                if sign > 0:
+                    using.add(index)
+                else:
+                    using.discard(index)
+
+    def changedRows(self, content):
+        # (table, row) for every row that differs from the recorded tables,
+        # or None if rows were added or removed
+        if tuple(len(table) for table in self.tables) != content.sizes:
+            return None
+        changed = []
+        for table, (old_rows, new_rows) in enumerate(zip(self.tables, content.tables)):
+            for row, (old, new) in enumerate(zip(old_rows, new_rows)):
+                if old != new:
+                    changed.append((table, row))
+        return changed
+
+    def update(self, workers=1):
+        # Catches up with edits to the CSV files. Returns how many battles
+        # had to be re-run.
+        content = core.content_store.refresh()
+        changed = self.changedRows(content)
+        # New weights change which rows every battle draws, and studies
+        # saved before the random numbers changed can't be patched up
+        # either. (Studies saved before there were weights had none.)
+        weights = getattr(self, "weights", None) or (None,) * len(self.tables)
+        if changed is None or weights != content.weights or getattr(self, "stream_version", None) != streams.STREAM_VERSION:
+            return self.run(workers)
+
+        affected = set()
+        for key in changed:
+            affected |= self.battles_using.get(key, set())
+        if affected:
+            self.run(workers, affected)
+        self.tables = content.tables
+        return len(affected)
+
+    def attribution(self):
+        # A RowImpact for every row of every table, biggest impact first.
+        total = len(self.records)
+        rates = [wins / total if total else 0.0 for wins in self.side_wins]
+
+        impacts = []
+        for table, rows in enumerate(self.tables):
+            for row, affix in enumerate(rows):
+                used = [self.used[side][table][row] for side in range(2)]
+                wins = [self.wins[side][table][row] for side in range(2)]
+                plays = [self.plays[side][table][row] for side in range(2)]
+                if sum(used):
+                    # Wins above what those sides would have won anyway
+                    expected = used[0] * rates[0] + used[1] * rates[1]
+                    impact = (sum(wins) - expected) / sum(used)
+                else:
+                    impact = 0.0
+                impacts.append(RowImpact(table, row, affix.text, used, wins, plays, impact))
+        impacts.sort(key=lambda impact: impact.impact, reverse=True)
+        return impacts
+
+    def save(self, path):
+        with open(path, "wb") as study_file:
+            pickle.dump(self, study_file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def load(path):
+        with open(path, "rb") as study_file:
+            return pickle.load(study_file)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Attribute win rates to the rows of the affix tables.")
+    parser.add_argument("--battles", type=int, default=10000, help="battles in a new study")
+    parser.add_argument("--seed", type=int, default=0, help="seed for a new study")
+    parser.add_argument("--study", default="balance.bin", help="file the study is kept in; updated if it exists")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--top", type=int, default=10, help="how many rows to show at each end")
+    args = parser.parse_args(argv)
+
+    if os.path.exists(args.study):
+        study = BalanceStudy.load(args.study)
+        rerun = study.update(args.workers)
+        print("Re-ran %i of %i battles." % (rerun, study.battles))
+    else:
+        study = BalanceStudy(args.battles, args.seed)
+        study.run(args.workers)
+        print("Ran %i battles." % study.battles)
+    study.save(args.study)
+
+    impacts = study.attribution()
+    print("Strongest rows:")
+    for impact in impacts[:args.top]:
+        print("  ", impact)
+    print("Weakest rows:")
+    for impact in impacts[-args.top:]:
+        print("  ", impact)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
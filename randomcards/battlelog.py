@@ -0,0 +1,396 @@
+# A compact binary log of battles, and replays from it.
+#
+# Everything that happens in a battle apart from the random numbers is
+# which cards each side played, so that's all the log keeps. Each card
+# played is one little-endian word holding its card id (the 5 slot
+# indices, see cardIdFromSlots()) and the side that played it:
+#     card_id * 2 + side        side 0 is the player, 1 the opponent
+# The words are as few bytes as the tables need (3 for the current ones).
+# Turns alternate, so a change of side means a new turn; only turns where
+# nothing was played need a word of their own. The values above every
+# possible card are markers:
+#     EMPTY_TURN                a turn with no cards played
+#     BATTLE_DEFAULT            a battle starts, both sides as Player()
+#     BATTLE_STATE + states     a battle starts from these stats
+#     CHECKPOINT + round + states   both sides' stats after a turn
+#     END_BATTLE + winner       the battle is over (0 none, 1 player, 2 opponent)
+# where states is both sides' PLAYER_FIELDS as int32s, player first.
+# A battle with the default players is around 60 bytes.
+#
+# Replaying needs no random numbers: the recorded cards are handed to the
+# battle engine turn by turn. Checkpoints (if written) and the winner are
+# checked along the way, so a replay that goes differently is an error.
+#
+# The file starts with a header holding the table sizes and a fingerprint
+# of the tables, since the same card id means a different card once the
+# CSV files change. Any binary file object works, so for archives:
+#     writer = BattleLogWriter(gzip.open("battles.log.gz", "wb"))
+#
+# From the command line:
+#     python -m randomcards.battlelog record battles.log --battles 100000 --seed 1
+#     python -m randomcards.battlelog replay battles.log
+#     python -m randomcards.battlelog show battles.log 42
+
+import argparse
+import os
+import struct
+import sys
+import time
+
+from randomcards import cardindex, core, engine, tournament
+
+MAGIC = b"RCLG"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHB5I20s") # magic, version, word size, table sizes, fingerprint
+STATES = struct.Struct("<%ii" % (2 * len(core.PLAYER_FIELDS)))
+ROUND = struct.Struct("<I")
+
+# Markers, counted up from twice the number of cards
+EMPTY_TURN = 0
+BATTLE_DEFAULT = 1
+BATTLE_STATE = 2
+CHECKPOINT = 3
+END_BATTLE = 4 # 4, 5, 6: no winner, player won, opponent won
+MARKERS = 7
+
+WINNERS = (None, "player", "opponent")
+
+def defaultState():
+    # A Player() the way a Battle starts it, with no energy yet
+    player = core.Player()
+    player.energy_current = 0
+    return player.snapshot()
+
+_DEFAULT_STATE = defaultState()
+
+
+def wordSize(sizes):
+    # Bytes per word for tables of these sizes
+    return max(1, ((2 * core.cardCount(sizes) + MARKERS - 1).bit_length() + 7) // 8)
+
+def packStates(player, opponent):
+    return STATES.pack(*(player.snapshot() + opponent.snapshot()))
+
+def unpackStates(data):
+    values = STATES.unpack(data)
+    half = len(core.PLAYER_FIELDS)
+    return values[:half], values[half:]
+
+
+class BattleLogWriter:
+    # Writes battles to log_file (a path, or a binary file object) as they
+    # happen; pass it as simulateBattle(..., log=writer).
+    # checkpoint_every: also save both sides' stats every this many turns
+    # (0 for never), to catch replays going wrong early.
+    def __init__(self, log_file, content=None, checkpoint_every=0, buffer_size=1 << 16):
+        if content is None:
+            content = core.getContent()
+        self.content = content
+        self.fingerprint = cardindex.contentFingerprint(content)
+        self.word_size = wordSize(content.sizes)
+        self.base = 2 * core.cardCount(content.sizes)
+        self.checkpoint_every = checkpoint_every
+        self.buffer_size = buffer_size
+
+        self.owns_file = isinstance(log_file, str)
+        self.file = open(log_file, "wb") if self.owns_file else log_file
+        self.buffer = bytearray(HEADER.pack(MAGIC, FORMAT_VERSION, self.word_size, *content.sizes, self.fingerprint))
+        self.offset = len(self.buffer) # Bytes written so far, buffered or not
+        self.battles = 0
+        self.turns = 0 # Turns in the battle being written
+
+    def word(self, value):
+        self.buffer += value.to_bytes(self.word_size, "little")
+        self.offset += self.word_size
+
+    def data(self, data):
+        self.buffer += data
+        self.offset += len(data)
+
+    def beginBattle(self, battle):
+        # Returns where the battle starts in the log, for BattleLogReader.battleAt()
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+        start = self.offset
+        if battle.player.snapshot() == _DEFAULT_STATE and battle.opponent.snapshot() == _DEFAULT_STATE:
+            self.word(self.base + BATTLE_DEFAULT)
+        else:
+            self.word(self.base + BATTLE_STATE)
+            self.data(packStates(battle.player, battle.opponent))
+        self.turns = 0
+        return start
+
+    def checkCard(self, card):
+        # Raises ValueError if card can't go in this log. Battle.play()
+        # asks before it plays the card, and only calls play() once the
+        # card has been played, so the battle and the log always agree.
+        if card.content is not self.content and cardindex.contentFingerprint(card.content) != self.fingerprint:
+            raise ValueError("%s comes from different tables than the log was started with" % card)
+        if card.card_id is None:
+            raise ValueError("only cards made from the tables can be logged, not %s" % card)
+
+    def play(self, battle, card):
+        self.checkCard(card)
+        self.word(card.card_id << 1 | (not battle.player_turn))
+
+    def endTurn(self, battle):
+        if battle.plays_this_turn == 0:
+            self.word(self.base + EMPTY_TURN)
+        self.turns += 1
+        if self.checkpoint_every and self.turns % self.checkpoint_every == 0:
+            self.word(self.base + CHECKPOINT)
+            self.data(ROUND.pack(battle.round))
+            self.data(packStates(battle.player, battle.opponent))
+
+    def endBattle(self, battle):
+        self.word(self.base + END_BATTLE + WINNERS.index(battle.winner))
+        self.battles += 1
+
+    def flush(self):
+        self.file.write(self.buffer)
+        self.buffer = bytearray()
+
+    def close(self):
+        self.flush()
+        if self.owns_file:
+            self.file.close()
+        else:
+            self.file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class BattleRecord:
+    # One battle read back from a log.
+    # turns[i] is the card ids played in turn i (the player's turns are the
+    # even ones); checkpoints maps a number of turns played to
+    # (round, player state, opponent state) at that point.
+    def __init__(self, offset, player_state, opponent_state, turns, checkpoints, winner):
+        self.offset = offset
+        self.player_state = player_state
+        self.opponent_state = opponent_state
+        self.turns = turns
+        self.checkpoints = checkpoints
+        self.winner = winner
+
+    def players(self):
+        # Fresh Player objects in the starting state
+        player = core.Player()
+        player.restore(self.player_state)
+        opponent = core.Player()
+        opponent.restore(self.opponent_state)
+        return player, opponent
+
+
+class BattleLogReader:
+    # Reads a log written by BattleLogWriter. Iterate over it for every
+    # battle in order, or use battleAt() with an offset from beginBattle().
+    # The tables have to be the ones the log was written with, unless
+    # allow_changed_content is set (then only their sizes have to match,
+    # and replays will likely fail their checks).
+    def __init__(self, log_file, content=None, allow_changed_content=False, chunk_size=1 << 16):
+        if content is None:
+            content = core.getContent()
+        self.content = content
+        self.owns_file = isinstance(log_file, str)
+        self.file = open(log_file, "rb") if self.owns_file else log_file
+        self.chunk_size = chunk_size
+
+        header = self.file.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ValueError("not a battle log: too short")
+        magic, version, word_size, *sizes, fingerprint = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError("not a battle log")
+        if version != FORMAT_VERSION:
+            raise ValueError("battle log format %i, expected %i" % (version, FORMAT_VERSION))
+        if tuple(sizes) != content.sizes or (fingerprint != cardindex.contentFingerprint(content) and not allow_changed_content):
+            raise ValueError("the battle log was written with different tables")
+        self.word_size = word_size
+        self.base = 2 * core.cardCount(content.sizes)
+
+        self.cards = {} # card id -> Card, shared by every replay
+        self.data = b""
+        self.position = 0 # Next byte in data
+        self.data_offset = HEADER.size # Where data starts in the file
+
+    def read(self, n):
+        # The next n bytes of the log, or b"" at the end of it
+        if self.position + n > len(self.data):
+            self.data = self.data[self.position:] + self.file.read(max(n, self.chunk_size))
+            self.data_offset += self.position
+            self.position = 0
+            if len(self.data) < n:
+                if self.data:
+                    raise ValueError("battle log ends in the middle of a battle")
+                return b""
+        data = self.data[self.position:self.position + n]
+        self.position += n
+        return data
+
+    def readWord(self):
+        data = self.read(self.word_size)
+        if not data:
+            raise ValueError("battle log ends in the middle of a battle")
+        return int.from_bytes(data, "little")
+
+    def nextBattle(self):
+        # The next BattleRecord, or None at the end of the log
+        offset = self.data_offset + self.position
+        data = self.read(self.word_size)
+        if not data:
+            return None
+        marker = int.from_bytes(data, "little") - self.base
+        if marker == BATTLE_DEFAULT:
+            player_state = opponent_state = _DEFAULT_STATE
+        elif marker == BATTLE_STATE:
+            player_state, opponent_state = unpackStates(self.read(STATES.size))
+        else:
+            raise ValueError("expected the start of a battle at byte %i" % offset)
+
+        base = self.base
+        turns = []
+        checkpoints = {}
+        while True:
+            value = self.readWord()
+            if value < base:
+                side = value & 1
+                # The other side playing means the next turn has started
+                if not turns or (len(turns) - 1) % 2 != side:
+                    if len(turns) % 2 != side:
+                        raise ValueError("battle at byte %i: a side played twice in a row" % offset)
+                    turns.append([])
+                turns[-1].append(value >> 1)
+            elif value == base + EMPTY_TURN:
+                turns.append([])
+            elif value == base + CHECKPOINT:
+                round_number, = ROUND.unpack(self.read(ROUND.size))
+                checkpoints[len(turns)] = (round_number,) + unpackStates(self.read(STATES.size))
+            elif base + END_BATTLE <= value < base + END_BATTLE + len(WINNERS):
+                return BattleRecord(offset, player_state, opponent_state, turns, checkpoints, WINNERS[value - base - END_BATTLE])
+            else:
+                raise ValueError("battle at byte %i: unexpected marker %i" % (offset, value - base))
+
+    def __iter__(self):
+        while True:
+            record = self.nextBattle()
+            if record is None:
+                return
+            yield record
+
+    def battleAt(self, offset):
+        # The battle that starts offset bytes into the (uncompressed) log
+        self.file.seek(offset)
+        self.data = b""
+        self.position = 0
+        self.data_offset = offset
+        return self.nextBattle()
+
+    def card(self, card_id):
+        card = self.cards.get(card_id)
+        if card is None:
+            card = self.cards[card_id] = core.CardFromId(card_id, self.content)
+        return card
+
+    def replay(self, record):
+        # Plays record's cards through the engine and returns the finished
+        # engine.Battle. Raises ValueError if the stats at a
+        # checkpoint or the winner come out differently than logged.
+        player, opponent = record.players()
+        battle = engine.Battle(player, opponent, rng=None)
+        for number, turn in enumerate(record.turns):
+            battle.beginTurn([self.card(card_id) for card_id in turn])
+            while battle.hand:
+                battle.play(0)
+            battle.endTurn()
+
+            checkpoint = record.checkpoints.get(number + 1)
+            if checkpoint is not None and checkpoint != (battle.round, player.snapshot(), opponent.snapshot()):
+                raise ValueError("battle at byte %i went differently by turn %i" % (record.offset, number + 1))
+        if battle.winner != record.winner:
+            raise ValueError("battle at byte %i: replay won by %s, logged as won by %s" % (record.offset, battle.winner, record.winner))
+        return battle
+
+    def close(self):
+        if self.owns_file:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def recordTournament(path, battles, seed=0, max_rounds=1000, checkpoint_every=0):
+    # Runs battles battles, numbered like tournament.py's, into a new log.
+    # Returns the byte offset of every battle.
+    offsets = []
+    with BattleLogWriter(path, checkpoint_every=checkpoint_every) as writer:
+        for index in range(battles):
+            offsets.append(writer.offset)
+            engine.simulateBattle(core.Player(), core.Player(),
+                rng=tournament.battleRandom(seed, index), max_rounds=max_rounds, log=writer)
+    return offsets
+
+def showBattle(reader, record):
+    # Prints a replayed battle turn by turn
+    names = ("Player", "Opponent")
+    for number, turn in enumerate(record.turns):
+        cards = [reader.card(card_id) for card_id in turn]
+        print("Turn %i, %s: %s" % (number + 1, names[number % 2], ", ".join(map(str, cards)) if cards else "(nothing)"))
+    battle = reader.replay(record)
+    print("Player:", battle.player)
+    print("Opponent:", battle.opponent)
+    print("Winner:", battle.winner)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record battles to a compact binary log, and replay them.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    record = commands.add_parser("record", help="run tournament battles into a new log")
+    record.add_argument("log")
+    record.add_argument("--battles", type=int, default=10000)
+    record.add_argument("--seed", type=int, default=0)
+    record.add_argument("--max-rounds", type=int, default=1000)
+    record.add_argument("--checkpoint-every", type=int, default=0, help="save both sides' stats every this many turns")
+    replay = commands.add_parser("replay", help="replay every battle in a log and check it")
+    replay.add_argument("log")
+    show = commands.add_parser("show", help="print one battle from a log, turn by turn")
+    show.add_argument("log")
+    show.add_argument("battle", type=int, help="battle number, counting from 0")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    if args.command == "record":
+        recordTournament(args.log, args.battles, args.seed, args.max_rounds, args.checkpoint_every)
+        elapsed = time.perf_counter() - start
+        size = os.path.getsize(args.log) - HEADER.size
+        print("Recorded %i battles in %.2f s, %.1f bytes each." % (args.battles, elapsed, size / max(1, args.battles)))
+        return 0
+
+    with BattleLogReader(args.log) as reader:
+        if args.command == "show":
+            count = 0
+            for record in reader:
+                if count == args.battle:
+                    showBattle(reader, record)
+                    return 0
+                count += 1
+            print("The log only has %i battles." % count)
+            return 1
+
+        count = 0
+        for record in reader:
+            reader.replay(record)
+            count += 1
+        elapsed = time.perf_counter() - start
+        print("Replayed %i battles in %.2f s (%.0f per second)." % (count, elapsed, count / elapsed if elapsed else 0.0))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+# Benchmarks for the parts of the game simulations spend their time in.
+#
+# Every benchmark uses fixed seeds, so runs are comparable. Results can be
+# saved as a baseline, and later runs compared against it; anything that
+# got slower (or bigger) by more than the threshold is flagged and the
+# command exits with status 1.
+#
+#     python -m randomcards bench --save-baseline     # on a known-good version
+#     python -m randomcards bench                     # after a change
+#
+# Baselines are per machine, so bench_baseline.json isn't checked in.
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import timeit
+import tracemalloc
+
+from randomcards import constrained, core, engine, streams, tournament
+
+DEFAULT_BASELINE = os.path.join(core.CONTENT_DIR, "bench_baseline.json")
+SEED = 12345
+
+
+class Result:
+    # One measurement. lower_is_better says which way a regression goes.
+    def __init__(self, name, value, unit, lower_is_better=True):
+        self.name = name
+        self.value = value
+        self.unit = unit
+        self.lower_is_better = lower_is_better
+
+    def asDict(self):
+        return {"value": self.value, "unit": self.unit, "lower_is_better": self.lower_is_better}
+
+
+def timePerCall(function, number, repeat):
+    # Best time per call in microseconds. The best of a few repeats is the
+    # least disturbed by whatever else the machine is doing.
+    return min(timeit.repeat(function, number=number, repeat=repeat)) / number * 1e6
+
+def benchContentLoad(scale):
+    # Parsing all five CSV files from scratch, and getting the cached columns
+    def coldLoad():
+        core.ContentStore(check_interval=0).refresh()
+    yield Result("content_load_cold", timePerCall(coldLoad, 20 * scale, 5), "us")
+    yield Result("collect_from_files", timePerCall(core.CollectFromFiles, 2000 * scale, 5), "us")
+
+def benchCardMaker(scale):
+    rng = random.Random(SEED)
+    yield Result("card_maker_random", timePerCall(lambda: core.CardMakerRandom(rng), 2000 * scale, 5), "us")
+    stream = streams.StreamRandom(SEED)
+    yield Result("card_maker_stream", timePerCall(lambda: core.CardMakerRandom(stream), 2000 * scale, 5), "us")
+    # Per card, drawing a whole batch's slots at once
+    count = 10000
+    yield Result("card_batch_stream", timePerCall(lambda: core.CardBatchMakerRandom(count, stream), scale, 5) / count, "us")
+    # A rare constraint (about 1 card in 140), drawn without rejection
+    sampler = constrained.ConstrainedSampler(max_cost=1, include=["Healing", "Buff Damage", "Defense"])
+    yield Result("card_constrained", timePerCall(lambda: sampler.sample(rng), 2000 * scale, 5), "us")
+
+def benchCardPlay(scale):
+    # A fixed set of cards played into fresh players
+    rng = random.Random(SEED)
+    cards = [core.CardMakerRandom(rng) for i in range(1000)]
+    def playAll():
+        user = core.Player()
+        target = core.Player()
+        for card in cards:
+            card.play(user, target)
+    yield Result("card_play", timePerCall(playAll, 5 * scale, 5) / len(cards), "us")
+
+def benchBattle(scale):
+    seeds = iter(range(10 ** 9))
+    def oneBattle():
+        engine.simulateBattle(core.Player(), core.Player(), rng=random.Random(next(seeds)))
+    yield Result("battle", timePerCall(oneBattle, 50 * scale, 5), "us")
+
+def benchThroughput(scale):
+    # A single-process tournament, as battles per second
+    battles = 500 * scale
+    start = time.perf_counter()
+    tournament.runTournament(battles, seed=SEED, workers=1)
+    elapsed = time.perf_counter() - start
+    yield Result("tournament_throughput", battles / elapsed, "battles/s", lower_is_better=False)
+
+    try:
+        from randomcards import vectorized
+    except ImportError:
+        return # NumPy isn't installed
+    battles = 20000 * scale
+    start = time.perf_counter()
+    vectorized.simulateBattles(battles, SEED)
+    elapsed = time.perf_counter() - start
+    yield Result("vectorized_throughput", battles / elapsed, "battles/s", lower_is_better=False)
+
+def benchMemory(scale):
+    # Bytes held per card in a big list of cards, and the most memory a
+    # battle uses at once
+    rng = random.Random(SEED)
+    count = 10000
+    tracemalloc.start()
+    cards = [core.CardMakerRandom(rng) for i in range(count)]
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del cards
+    yield Result("memory_per_card", held / count, "bytes")
+
+    tracemalloc.start()
+    engine.simulateBattle(core.Player(), core.Player(), rng=random.Random(SEED))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    yield Result("memory_per_battle", peak, "bytes")
+
+BENCHMARKS = (benchContentLoad, benchCardMaker, benchCardPlay, benchBattle, benchThroughput, benchMemory)
+
+def runBenchmarks(scale=1):
+    # scale makes every benchmark do proportionally more work
+    results = []
+    core.getContent() # Load the content once so the first benchmark doesn't pay for it
+    for benchmark in BENCHMARKS:
+        results.extend(benchmark(scale))
+    return results
+
+
+def compareToBaseline(results, baseline, threshold):
+    # Returns (lines of the report, names of benchmarks that regressed)
+    lines = []
+    regressions = []
+    for result in results:
+        line = "%-24s %14.2f %-10s" % (result.name, result.value, result.unit)
+        base = baseline.get(result.name)
+        if base and base["value"]:
+            change = (result.value - base["value"]) / base["value"]
+            worse = change > threshold if result.lower_is_better else -change > threshold
+            line += " %+7.1f%%" % (100.0 * change)
+            if worse:
+                line += "  REGRESSION"
+                regressions.append(result.name)
+        lines.append(line)
+    return lines, regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark content loading, card generation, Card.play and battles.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline file to compare against or save to")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.10, help="flag changes worse than this fraction (default 0.10)")
+    parser.add_argument("--scale", type=int, default=1, help="multiply the work each benchmark does")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    results = runBenchmarks(args.scale)
+
+    baseline = {}
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+
+    lines, regressions = compareToBaseline(results, baseline, args.threshold)
+    if args.json:
+        print(json.dumps({result.name: result.asDict() for result in results}, indent=2))
+    else:
+        print("\n".join(lines))
+
+    # With --json, stdout is only the JSON; anything else goes to stderr
+    messages = sys.stderr if args.json else sys.stdout
+    if args.save_baseline:
+        with open(args.baseline, "w") as baseline_file:
+            json.dump({result.name: result.asDict() for result in results}, baseline_file, indent=2)
+        print("Saved baseline to %s" % args.baseline, file=messages)
+    elif regressions:
+        print("%i regression(s) beyond %.0f%%: %s" % (len(regressions), 100.0 * args.threshold, ", ".join(regressions)), file=messages)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+# A precomputed index of every card the affix tables can make.
+#
+# Each card is numbered by its card id (see cardIdFromSlots() in
+# core.py). For every id, the index stores the card's cost and
+# the summed power of each effect, e.g. a card with Damage 2 and Damage 3
+# has 5 under "Damage". Nothing about the card has to be built to look
+# these up.
+#
+# The numbers are kept in a file, one column of 16-bit ints per field,
+# which is opened with mmap. Lookups just read from the mapped file, and
+# any number of processes can open the same file while the OS keeps a
+# single copy of it in memory.
+#
+# Build it (or rebuild it after editing the CSV files) with:
+#     python -m randomcards.cardindex
+
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from randomcards import core
+
+# Fields stored for every card: the cost, then one per effect code 1-17
+FIELDS = ("cost",) + core.EFFECT_NAMES[1:]
+
+DEFAULT_PATH = os.path.join(core.CONTENT_DIR, "cards_index.bin")
+
+# File layout (little-endian):
+#   header: magic, format version, field count, 5 table sizes, card count,
+#           content fingerprint
+#   then len(FIELDS) columns of card-count int16s, in FIELDS order
+MAGIC = b"RCIX"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHH5IQ20s")
+_VALUE = struct.Struct("<h")
+
+
+def contentFingerprint(content):
+    # A hash of everything in the tables, so an index built from different
+    # CSV files can be told apart. Row weights change which cards the random
+    # numbers make, so battle logs and checkpoints can't be replayed with
+    # different ones; they're hashed too when a table has them (tables
+    # without weights keep the fingerprint they always had).
+    return content.derived("fingerprint", buildFingerprint)
+
+def buildFingerprint(content):
+    described = repr(content.tables)
+    if content.weighted:
+        described += repr(content.weights)
+    return hashlib.sha1(described.encode("utf-8")).digest()
+
+def rowValues(content, field):
+    # For each table, the value every row adds to field
+    values = []
+    for table in content.tables:
+        if field == "cost":
+            values.append([row.cost for row in table])
+        else:
+            values.append([sum(power for effect, power in zip(row.effects, row.powers) if effect == field) for row in table])
+    return values
+
+def buildColumn(content, field):
+    # The field for every card in card id order. A card's value is the sum
+    # of its rows' values, and ids count up with the last slot fastest,
+    # so each table just multiplies the column out.
+    tables = rowValues(content, field)
+    column = tables[0]
+    for values in tables[1:]:
+        column = [total + value for total in column for value in values]
+    return column
+
+def buildCardIndex(path=DEFAULT_PATH, content=None):
+    # Writes the index for content (default: the current tables) to path.
+    if content is None:
+        content = core.getContent()
+    count = core.cardCount(content.sizes)
+
+    # Write to a temporary file first, so readers never see half an index
+    temporary_path = path + ".tmp"
+    with open(temporary_path, "wb") as index_file:
+        index_file.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(FIELDS), *content.sizes, count, contentFingerprint(content)))
+        for field in FIELDS:
+            column = buildColumn(content, field)
+            if min(column) < -32768 or max(column) > 32767:
+                raise ValueError("%s doesn't fit in the index: values go from %i to %i" % (field, min(column), max(column)))
+            column = array("h", column)
+            if sys.byteorder == "big":
+                column.byteswap()
+            index_file.write(column.tobytes())
+    os.replace(temporary_path, path)
+    return path
+
+
+class CardIndex:
+    # An open index file. Use lookup(card_id) or lookupSlots(slots) for one
+    # card, or column(field) to scan a whole field.
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        with open(path, "rb") as index_file:
+            self._map = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, field_count, *sizes, count, fingerprint = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != FORMAT_VERSION or field_count != len(FIELDS):
+            self._map.close()
+            raise ValueError("%s is not a card index this version can read" % path)
+        self.sizes = tuple(sizes)
+        self.count = count
+        self.fingerprint = fingerprint
+
+        # memoryview.cast() reads native order, which is what we wrote
+        # unless this machine is big-endian.
+        self._swap = sys.byteorder == "big"
+        self._columns = []
+        view = memoryview(self._map)
+        for f in range(len(FIELDS)):
+            start = HEADER.size + 2 * count * f
+            self._columns.append(view[start:start + 2 * count].cast("h"))
+
+    def close(self):
+        for column in self._columns:
+            column.release()
+        self._columns = []
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def matches(self, content):
+        # True if the index was built from exactly these tables
+        return self.sizes == content.sizes and self.fingerprint == contentFingerprint(content)
+
+    def column(self, field):
+        # The whole field as a sequence of ints in card id order
+        if self._swap:
+            column = array("h", self._columns[FIELDS.index(field)])
+            column.byteswap()
+            return column
+        return self._columns[FIELDS.index(field)]
+
+    def value(self, card_id, field):
+        if self._swap:
+            # Just this one number, read as little-endian straight from the
+            # file, rather than a swapped copy of the whole column
+            if card_id < 0:
+                card_id += self.count
+            if not 0 <= card_id < self.count:
+                raise IndexError("card id out of range")
+            return _VALUE.unpack_from(self._map, HEADER.size + 2 * (self.count * FIELDS.index(field) + card_id))[0]
+        return self._columns[FIELDS.index(field)][card_id]
+
+    def cost(self, card_id):
+        return self.value(card_id, "cost")
+
+    def lookup(self, card_id):
+        # (cost, powers), where powers[code - 1] is the summed power of
+        # effect code 1-17 (see core.EFFECT_NAMES).
+        if self._swap:
+            values = [self.value(card_id, field) for field in FIELDS]
+        else:
+            values = [column[card_id] for column in self._columns]
+        return values[0], tuple(values[1:])
+
+    def lookupSlots(self, slots):
+        return self.lookup(core.cardIdFromSlots(slots, self.sizes))
+
+def openCardIndex(path=DEFAULT_PATH, content=None):
+    # Opens the index, building it first if it's missing or out of date.
+    if content is None:
+        content = core.getContent()
+    if os.path.exists(path):
+        index = CardIndex(path)
+        if index.matches(content):
+            return index
+        index.close()
+    buildCardIndex(path, content)
+    return CardIndex(path)
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_PATH
+    buildCardIndex(path)
+    with CardIndex(path) as index:
+        print("Indexed %i cards into %s" % (index.count, path))
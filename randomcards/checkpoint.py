@@ -0,0 +1,282 @@
+# Checkpoints of battles in progress, so a match host can save every game
+# it's running and pick them all up again after a restart (or on another
+# machine).
+#
+# A battle is packed into one fixed-size record (RECORD.size bytes) with:
+#   a tag saying which game it is (any 64-bit number the caller likes),
+#   both players' PLAYER_FIELDS (energy_current included), whose turn it
+#   is, the winner so far, the round, cards played, the hand as card ids
+#   (each one is the card's slot rows packed into a number, see
+#   core.cardIdFromSlots()), and the StreamRandom's key and position.
+# Unpacking it gives a Battle that goes on exactly as the original would
+# have. Only battles drawing from a streams.StreamRandom can be saved;
+# the state of a random.Random is 2.5 KB. Perks and the battle's log
+# aren't saved (cards never change perks).
+#
+# A checkpoint file is a header and then records, only ever appended to.
+# The last record for a tag is the one that counts, and forget() appends
+# a record that says the game is gone. Appending a batch of records is a
+# single write() (20,000 games take about 150 ms, half what pickling
+# them does), and reading them back goes through mmap, one record at a
+# time. A record cut short by a crash at the end of the file is ignored.
+#
+#     with CheckpointWriter("games.ckpt") as checkpoints:
+#         checkpoints.write(sessions.items())   # (tag, battle) pairs
+#     games = CheckpointReader("games.ckpt").resume() # {tag: battle}
+
+import mmap
+import operator
+import os
+import struct
+
+from randomcards import cardindex, core
+from randomcards.engine import Battle
+from randomcards.streams import StreamRandom
+
+HAND_SLOTS = 32 # Cards a record can hold; hands of 20+ happen, but rarely
+MAX_ROUND = 0xFFFF # Rounds a record can count to (battles usually stop at 1000)
+MAX_PLAYS = 0xFF # Cards played in one turn a record can count
+
+_FIELDS = len(core.PLAYER_FIELDS)
+
+# A record is packed in three parts, so the hand doesn't have to be
+# padded out to HAND_SLOTS ids first:
+#   tag, start of the content fingerprint, player and opponent fields,
+#   flags, hand size, plays this turn, round, cards played by each side
+_HEAD = struct.Struct("<Q8s%iiBBHIII" % (2 * _FIELDS))
+#   the hand's card ids (the rest of the HAND_SLOTS are 0)
+_HANDS = [struct.Struct("<%iI" % size) for size in range(HAND_SLOTS + 1)]
+_EMPTY_HAND = bytes(_HANDS[HAND_SLOTS].size)
+#   random key, random position, random gauss_next (NaN for None)
+_TAIL = struct.Struct("<32sQd")
+RECORD = struct.Struct(_HEAD.format + "%iI" % HAND_SLOTS + _TAIL.format[1:])
+
+# Flags
+PLAYER_TURN = 1
+WINNER_SHIFT = 1 # Two bits: 0 no winner yet, 1 player, 2 opponent
+FORGOTTEN = 8 # The game is over or abandoned; nothing to resume
+
+WINNERS = (None, "player", "opponent")
+WINNER_CODES = {winner: code for code, winner in enumerate(WINNERS)}
+
+MAGIC = b"RCCP"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHH20s") # magic, version, record size, fingerprint
+
+_TAG = struct.Struct("<Q")
+_FLAGS_OFFSET = struct.calcsize("<Q8s%ii" % (2 * _FIELDS))
+_player_state = operator.attrgetter(*core.PLAYER_FIELDS) # Player.snapshot() without the call
+
+
+def packBattle(battle, tag=0, buffer=None, offset=0, fingerprint=None):
+    # Packs battle into buffer at offset, or into new bytes if buffer is
+    # None. fingerprint is cardindex.contentFingerprint() of the content
+    # the checkpoint is for (that of the hand if not given); a hand made
+    # from any other content is refused.
+    rng = battle.rng
+    if not isinstance(rng, StreamRandom):
+        raise ValueError("only battles drawing from a StreamRandom can be checkpointed")
+    hand = battle.hand
+    if len(hand) > HAND_SLOTS:
+        raise ValueError("a hand of %i cards doesn't fit in a checkpoint" % len(hand))
+    if battle.round > MAX_ROUND:
+        raise ValueError("round %i doesn't fit in a checkpoint (at most %i)" % (battle.round, MAX_ROUND))
+    if battle.plays_this_turn > MAX_PLAYS:
+        raise ValueError("%i cards played in a turn don't fit in a checkpoint (at most %i)" % (battle.plays_this_turn, MAX_PLAYS))
+    card_ids = [card.card_id for card in hand]
+    if None in card_ids:
+        raise ValueError("only cards made from the tables can be checkpointed")
+    if hand:
+        # A card id only means something with the tables it came from
+        content = hand[0].content
+        made_with = cardindex.contentFingerprint(content)
+        for card in hand:
+            if card.content is not content and cardindex.contentFingerprint(card.content) != made_with:
+                raise ValueError("the hand's cards were made from different tables")
+        if fingerprint is None:
+            fingerprint = made_with
+        elif fingerprint != made_with:
+            raise ValueError("the battle's cards were made from different tables than the checkpoint's")
+    elif fingerprint is None:
+        fingerprint = cardindex.contentFingerprint(core.getContent())
+    if buffer is None:
+        record = bytearray(RECORD.size)
+        packBattle(battle, tag, record, 0, fingerprint)
+        return bytes(record)
+
+    _HEAD.pack_into(buffer, offset, tag, fingerprint[:8], *_player_state(battle.player), *_player_state(battle.opponent),
+        battle.player_turn | WINNER_CODES[battle.winner] << WINNER_SHIFT, len(hand),
+        battle.plays_this_turn, battle.round, battle.player_cards_played, battle.opponent_cards_played)
+    offset += _HEAD.size
+    hand_size = _HANDS[len(hand)].size
+    _HANDS[len(hand)].pack_into(buffer, offset, *card_ids)
+    buffer[offset + hand_size:offset + len(_EMPTY_HAND)] = _EMPTY_HAND[hand_size:]
+    gauss_next = rng.gauss_next
+    _TAIL.pack_into(buffer, offset + len(_EMPTY_HAND), rng.key, rng.position, float("nan") if gauss_next is None else gauss_next)
+
+def unpackBattle(data, offset=0, content=None):
+    # The (tag, Battle) packed at offset of data. The hand is made from
+    # content (default: the current tables), which has to be the content
+    # it was saved from.
+    values = RECORD.unpack_from(data, offset)
+    if content is None:
+        content = core.getContent()
+    if values[1] != cardindex.contentFingerprint(content)[:8]:
+        raise ValueError("the checkpoint was made with different tables")
+    (flags, hand_size, plays_this_turn, battle_round, player_cards_played, opponent_cards_played) = values[2 + 2 * _FIELDS:8 + 2 * _FIELDS]
+    key, position, gauss_next = values[-3:]
+
+    rng = StreamRandom(key=key)
+    rng.position = position
+    rng.gauss_next = None if gauss_next != gauss_next else gauss_next # NaN for None
+
+    battle = Battle(core.Player(), core.Player(), rng)
+    # After Battle(), which starts energy_current from nothing
+    battle.player.restore(values[2:2 + _FIELDS])
+    battle.opponent.restore(values[2 + _FIELDS:2 + 2 * _FIELDS])
+    battle.player_turn = bool(flags & PLAYER_TURN)
+    battle.winner = WINNERS[flags >> WINNER_SHIFT & 3]
+    card_ids = values[8 + 2 * _FIELDS:8 + 2 * _FIELDS + hand_size]
+    battle.hand = [core.CardFromId(card_id, content) for card_id in card_ids]
+    battle.plays_this_turn = plays_this_turn
+    battle.round = battle_round
+    battle.player_cards_played = player_cards_played
+    battle.opponent_cards_played = opponent_cards_played
+    return values[0], battle
+
+
+class CheckpointWriter:
+    # Appends records to a checkpoint file, starting it if it doesn't
+    # exist yet. Records go straight to the file; flush(sync=True) also
+    # waits for them to reach the disk.
+    def __init__(self, path, content=None):
+        if content is None:
+            content = core.getContent()
+        self.fingerprint = cardindex.contentFingerprint(content)
+
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, "rb") as checkpoint_file:
+                readHeader(checkpoint_file.read(HEADER.size), path, self.fingerprint)
+            self.file = open(path, "ab")
+            # Line back up with the records if a crash cut the last one short
+            self.file.truncate(HEADER.size + (os.path.getsize(path) - HEADER.size) // RECORD.size * RECORD.size)
+        else:
+            self.file = open(path, "wb")
+            self.file.write(HEADER.pack(MAGIC, FORMAT_VERSION, RECORD.size, self.fingerprint))
+
+    def write(self, games):
+        # Appends a record for each (tag, battle) in games, all in one
+        # write. Returns how many there were.
+        games = list(games)
+        buffer = bytearray(len(games) * RECORD.size)
+        offset = 0
+        for tag, battle in games:
+            packBattle(battle, tag, buffer, offset, self.fingerprint)
+            offset += RECORD.size
+        self.file.write(buffer)
+        return len(games)
+
+    def forget(self, tags):
+        # Marks games as finished, so they aren't resumed
+        record = bytearray(RECORD.size)
+        record[8:16] = self.fingerprint[:8]
+        record[_FLAGS_OFFSET] = FORGOTTEN
+        records = bytearray()
+        for tag in tags:
+            _TAG.pack_into(record, 0, tag)
+            records += record
+        self.file.write(records)
+
+    def flush(self, sync=False):
+        self.file.flush()
+        if sync:
+            os.fsync(self.file.fileno())
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class CheckpointReader:
+    # The records of a checkpoint file, read through mmap. Indexing gives
+    # (tag, Battle) for any record; resume() gives the latest Battle of
+    # every game that hasn't been forgotten.
+    def __init__(self, path, content=None):
+        if content is None:
+            content = core.getContent()
+        self.content = content
+        with open(path, "rb") as checkpoint_file:
+            if os.fstat(checkpoint_file.fileno()).st_size == 0:
+                # Nothing written to it yet (and mmap can't map an empty file)
+                self.map = None
+                self.count = 0
+                return
+            self.map = mmap.mmap(checkpoint_file.fileno(), 0, access=mmap.ACCESS_READ)
+        readHeader(self.map[:HEADER.size], path, cardindex.contentFingerprint(content))
+        self.count = (len(self.map) - HEADER.size) // RECORD.size
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.count:
+            raise IndexError("record %i of %i" % (index, self.count))
+        return unpackBattle(self.map, HEADER.size + index * RECORD.size, self.content)
+
+    def latest(self):
+        # {tag: record index} for the last record of every live game,
+        # without unpacking any battles
+        latest = {}
+        data = self.map
+        for offset in range(HEADER.size, HEADER.size + self.count * RECORD.size, RECORD.size):
+            tag = _TAG.unpack_from(data, offset)[0]
+            if data[offset + _FLAGS_OFFSET] & FORGOTTEN:
+                latest.pop(tag, None)
+            else:
+                latest[tag] = (offset - HEADER.size) // RECORD.size
+        return latest
+
+    def resume(self):
+        # {tag: Battle} for every game still going
+        return {tag: self[index][1] for tag, index in self.latest().items()}
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def readHeader(header, path, fingerprint):
+    if len(header) < HEADER.size:
+        raise ValueError("%s is not a checkpoint file: too short" % path)
+    magic, version, record_size, file_fingerprint = HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError("%s is not a checkpoint file" % path)
+    if version != FORMAT_VERSION or record_size != RECORD.size:
+        raise ValueError("%s is checkpoint format %i, expected %i" % (path, version, FORMAT_VERSION))
+    if file_fingerprint != fingerprint:
+        raise ValueError("%s was written with different tables" % path)
+
+def compactCheckpoints(path, content=None):
+    # Rewrites path with only the latest record of each live game
+    with CheckpointReader(path, content) as reader:
+        if reader.map is None:
+            return 0 # An empty file is already as small as it gets
+        records = [reader.map[HEADER.size + index * RECORD.size:HEADER.size + (index + 1) * RECORD.size] for index in reader.latest().values()]
+        header = reader.map[:HEADER.size]
+    temporary_path = path + ".tmp"
+    with open(temporary_path, "wb") as checkpoint_file:
+        checkpoint_file.write(header)
+        checkpoint_file.write(b"".join(records))
+    os.replace(temporary_path, path)
+    return len(records)
@@ -0,0 +1,240 @@
+# Random cards that meet constraints, such as "costs 2 or less", "has a
+# Healing effect" or "no Reduce Deck", without making cards and throwing
+# away the ones that don't fit (which takes thousands of tries when the
+# constraints are rare).
+#
+# A card's cost is the sum of its rows' costs, and it has an effect if
+# any of its rows has it. So whether a card fits only depends on, row by
+# row, the row's cost and which of the included effects it has. Rows with
+# an excluded effect are left out of their table altogether. Going
+# through the tables in order, a partial card is just (cost so far,
+# included effects so far), and counting how many ways each of those can
+# still be finished (dynamic programming from the last table back) gives
+# the exact number of cards that fit. A card is then one random number
+# below that number: each row is picked in proportion to how many of the
+# fitting cards go through it, so every fitting card is exactly as likely
+# as the others, however few of them there are.
+#
+#     sampler = ConstrainedSampler(max_cost=2, include=["Healing"], exclude=["Reduce Deck"])
+#     sampler.count               # how many different cards fit
+#     card = sampler.sample(rng)  # one of them
+#
+# With weighted=True, rows count as often as their weight (see RARITY in
+# core.py), which gives the cards CardMakerRandom() deals, minus the ones
+# that don't fit. A sampler keeps the Content it was made from; make a
+# new one after the CSV files change.
+#
+# From the command line:
+#     python -m randomcards.constrained --max-cost 2 --include Healing --exclude "Reduce Deck" --cards 5
+
+import argparse
+import random
+import sys
+from bisect import bisect_right
+
+from randomcards import core
+
+
+def buildSlotIndex(content):
+    # For each table, (rows by effect code, rows by cost). Row sets are
+    # bitmasks of row numbers, so a table's rows with any of several
+    # effects is just an or of their masks.
+    index = []
+    for table in content.tables:
+        by_effect = [0] * len(core.EFFECT_NAMES)
+        by_cost = {}
+        for row_number, row in enumerate(table):
+            bit = 1 << row_number
+            for effect in row.effects:
+                by_effect[core.EFFECT_CODES.get(effect, 0)] |= bit
+            by_cost[row.cost] = by_cost.get(row.cost, 0) | bit
+        index.append((tuple(by_effect), by_cost))
+    return tuple(index)
+
+def effectCode(name):
+    # The code of an effect, from its name as the CSV files spell it (in
+    # any case)
+    for code, effect in enumerate(core.EFFECT_NAMES):
+        if code != 0 and effect.lower() == name.strip().lower():
+            return code
+    raise ValueError("unknown effect %r; the effects are %s" % (name, ", ".join(core.EFFECT_NAMES[1:])))
+
+def maskRows(mask):
+    # The row numbers in a bitmask, in order
+    rows = []
+    while mask:
+        low = mask & -mask
+        rows.append(low.bit_length() - 1)
+        mask ^= low
+    return rows
+
+
+class ConstrainedSampler:
+    # Every card of content (default: the current tables) costing from
+    # min_cost to max_cost (None for no limit), with at least one of each
+    # effect in include and none of the effects in exclude.
+    #   count: how many different cards that is
+    #   sample(rng), sampleMany(n, rng): random ones of them
+    def __init__(self, min_cost=None, max_cost=None, include=(), exclude=(), weighted=False, content=None):
+        if content is None:
+            content = core.getContent()
+        self.content = content
+        self.min_cost = min_cost
+        self.max_cost = max_cost
+        self.include = tuple(sorted({effectCode(name) for name in include}))
+        self.exclude = tuple(sorted({effectCode(name) for name in exclude}))
+        both = set(self.include) & set(self.exclude)
+        if both:
+            raise ValueError("%s can't be both included and excluded" % core.EFFECT_NAMES[min(both)])
+        self.weighted = weighted
+
+        # Each table's usable rows, grouped by what they add to a partial
+        # card: {(cost, bits of the included effects they have): rows}
+        self.groups = []
+        for by_effect, by_cost in content.derived("slot_index", buildSlotIndex):
+            excluded = 0
+            for code in self.exclude:
+                excluded |= by_effect[code]
+            groups = {}
+            for cost, rows in sorted(by_cost.items()):
+                for row_number in maskRows(rows & ~excluded):
+                    has = 0
+                    for bit, code in enumerate(self.include):
+                        if by_effect[code] >> row_number & 1:
+                            has |= 1 << bit
+                    groups.setdefault((cost, has), []).append(row_number)
+            self.groups.append(groups)
+
+        # The partial cards each table can be reached with
+        self.starts = [{(0, 0)}]
+        for groups in self.groups:
+            self.starts.append({(cost + add_cost, has | add_has) for cost, has in self.starts[-1] for add_cost, add_has in groups})
+
+        # How much each group counts for: its number of rows, or with
+        # weighted, its rows' summed weight (and their running totals, for
+        # picking a row inside it)
+        weights = content.weights
+        self.group_weights = []
+        for s, groups in enumerate(self.groups):
+            group_weights = {}
+            for key, rows in groups.items():
+                if weighted and weights[s] is not None:
+                    running = []
+                    total = 0
+                    for row in rows:
+                        total += weights[s][row]
+                        running.append(total)
+                    group_weights[key] = (total, tuple(running))
+                else:
+                    group_weights[key] = (len(rows), None)
+            self.group_weights.append(group_weights)
+
+        self.ways = self.completions([{key: total for key, (total, running) in group_weights.items()} for group_weights in self.group_weights])
+        self.total = self.ways[0][0, 0] # sample() draws a number below this
+        if weighted:
+            self.count = self.completions([{key: len(rows) for key, rows in groups.items()} for groups in self.groups])[0][0, 0]
+        else:
+            self.count = self.total
+        self.choices = self.buildChoices()
+
+    def fits(self, cost, has):
+        return ((self.min_cost is None or cost >= self.min_cost) and (self.max_cost is None or cost <= self.max_cost)
+            and has == (1 << len(self.include)) - 1)
+
+    def completions(self, group_sizes):
+        # For every table s, {partial card: ways it can be finished from
+        # table s on}, where each group counts group_sizes[s][group] times
+        ways = {state: 1 if self.fits(*state) else 0 for state in self.starts[-1]}
+        tables = [ways]
+        for s in range(len(self.groups) - 1, -1, -1):
+            sizes = group_sizes[s].items()
+            next_ways = ways
+            ways = {}
+            for cost, has in self.starts[s]:
+                ways[cost, has] = sum(size * next_ways[cost + add_cost, has | add_has] for (add_cost, add_has), size in sizes)
+            tables.append(ways)
+        tables.reverse()
+        return tables
+
+    def buildChoices(self):
+        # For every table and partial card that can still be finished:
+        # (running totals, options), with an option for each group of rows
+        # that leads to a fitting card: (rows, running totals of their
+        # weights or None when they count once each, next partial card,
+        # its ways)
+        choices = []
+        for s, groups in enumerate(self.groups):
+            next_ways = self.ways[s + 1]
+            table_choices = {}
+            for (cost, has), ways in self.ways[s].items():
+                if not ways:
+                    continue
+                running = []
+                options = []
+                total = 0
+                for (add_cost, add_has), rows in groups.items():
+                    state = (cost + add_cost, has | add_has)
+                    group_total, row_running = self.group_weights[s][add_cost, add_has]
+                    if group_total and next_ways[state]:
+                        total += group_total * next_ways[state]
+                        running.append(total)
+                        options.append((tuple(rows), row_running, state, next_ways[state]))
+                table_choices[cost, has] = (tuple(running), tuple(options))
+            choices.append(table_choices)
+        return choices
+
+    def slotsFor(self, number):
+        # The slots of fitting card number (0 <= number < total). Each
+        # table's pick uses up part of the number, and the rest picks the
+        # remaining tables.
+        state = (0, 0)
+        slots = [0] * len(self.choices)
+        for s, table_choices in enumerate(self.choices):
+            running, options = table_choices[state]
+            i = bisect_right(running, number)
+            rows, row_running, state, next_ways = options[i]
+            if i:
+                number -= running[i - 1]
+            unit, number = divmod(number, next_ways)
+            slots[s] = rows[unit] if row_running is None else rows[bisect_right(row_running, unit)]
+        return tuple(slots)
+
+    def sample(self, rng=random):
+        # A random fitting card. rng is anything with randrange(), like
+        # CardMakerRandom()'s.
+        if not self.total:
+            raise ValueError("no card meets the constraints")
+        return core.CardFromSlots(self.slotsFor(rng.randrange(self.total)), self.content)
+
+    def sampleMany(self, n, rng=random):
+        if not self.total:
+            raise ValueError("no card meets the constraints")
+        total = self.total
+        content = self.content
+        return [core.CardFromSlots(self.slotsFor(rng.randrange(total)), content) for i in range(n)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Count the cards that meet some constraints, and draw random ones of them.")
+    parser.add_argument("--min-cost", type=int, help="cards cost at least this")
+    parser.add_argument("--max-cost", type=int, help="cards cost at most this")
+    parser.add_argument("--include", action="append", default=[], metavar="EFFECT", help="cards have this effect (can be repeated)")
+    parser.add_argument("--exclude", action="append", default=[], metavar="EFFECT", help="cards don't have this effect (can be repeated)")
+    parser.add_argument("--weighted", action="store_true", help="draw rows by their WEIGHT/RARITY instead of all equally")
+    parser.add_argument("--cards", type=int, default=10, help="how many cards to draw")
+    parser.add_argument("--seed", type=int, help="seed for the random numbers")
+    args = parser.parse_args(argv)
+
+    try:
+        sampler = ConstrainedSampler(args.min_cost, args.max_cost, args.include, args.exclude, args.weighted)
+    except ValueError as error:
+        parser.error(str(error))
+    every = core.cardCount(sampler.content.sizes)
+    print("%i of %i cards fit (%.4f%%)" % (sampler.count, every, 100.0 * sampler.count / every))
+    if sampler.total:
+        for card in sampler.sampleMany(args.cards, random.Random(args.seed)):
+            print(repr(card))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
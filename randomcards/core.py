@@ -0,0 +1,930 @@
+# Idea: The computer generates random cards by assembling
+# words into certain spots. These words determine the
+# power, cost, and effects of the card.
+
+# For example:
+# [Adjective(s)] [Noun] of [Noun(s)]
+
+# We should start by defining a class called Card.
+# It will probably be the superclass of something or other.
+# In any case, it should be endowed with all the necessary
+# properties of a card: color, power, cost, effects, and so on.
+
+import csv
+import hashlib
+import math
+import operator
+import os
+import random
+import sys
+import time
+from array import array
+from collections import namedtuple
+from itertools import repeat
+
+# Effect names as they appear in the CSV files, numbered to match the
+# list in Card below. Code 0 is an empty (or unknown) effect.
+EFFECT_NAMES = (
+    "", "Damage", "Defense", "Healing", "Boost Energy", "Boost Deck",
+    "Reduce Energy", "Reduce Deck", "Debuff Damage", "Debuff Defense",
+    "Debuff Healing", "Debuff Energy", "Debuff Deck", "Buff Damage",
+    "Buff Defense", "Buff Healing", "Buff Energy", "Buff Deck",
+)
+EFFECT_CODES = {effect: code for code, effect in enumerate(EFFECT_NAMES)}
+
+# Every card gets the same background color for now.
+CARD_COLOR = "#FFEBCD"
+
+class Card:
+    # Cards are made in huge numbers during simulations, so a card only
+    # keeps a reference to the (shared) Content it was made from, its card
+    # id (see cardIdFromSlots()), and its cost. Everything else - the name,
+    # effects, powers - is looked up from the content's rows when asked for.
+    __slots__ = ("content", "card_id", "cost", "_ops")
+
+    # Every card is drawn in the same color for now.
+    color = CARD_COLOR #STRING (color code)
+
+    def __init__(self, content, card_id, cost=None):
+        self.content = content # The Content snapshot holding the card's rows
+        self.card_id = card_id #INT, or None for a card made by hand (see fromParts)
+
+        # Cost: The character expends this much of their
+        # main resource in order to use the card.
+        if cost is None:
+            cost = sum(row.cost for row in self.rows)
+        self.cost = cost #INT
+
+        # Ops: the effects that actually do something, as (effect code, power)
+        # pairs in the same order as effects. This is what play() runs.
+        # Worked out the first time the card is played.
+        self._ops = None
+
+    @classmethod
+    def fromParts(cls, prefix1, prefix2, name, suffix1, suffix2, effects, powers, cost):
+        # Makes a card by hand, without the affix tables: 5 strings, 15 effects
+        # and 15 powers (three per part, in name order), and a total cost.
+        # It gets a little content of its own with one row per table.
+        # Always a plain Card, even from a subclass (cards_random.Card
+        # takes the old constructor's arguments instead).
+        return Card(partsContent((prefix1, prefix2, name, suffix1, suffix2), effects, powers, cost), None, cost)
+
+    def __reduce__(self):
+        # Pickle the card id and the fingerprint of the tables it's from;
+        # the rows come from whatever content is loaded when it's
+        # unpickled, which has to be the same tables.
+        if self.card_id is None:
+            return (Card.fromParts, tuple(self.fullnamelist) + (self.effects, self.powers, self.cost))
+        from randomcards import cardindex # It imports this module
+        return (cardFromPickle, (self.card_id, cardindex.contentFingerprint(self.content)))
+
+    # Card name will take the form of:
+    # prefix1 prefix2 name suffix1 suffix2
+
+    # Ex:
+    # "Extreme ""Blazing ""Cannonball""" of Icy ""Doom"
+
+    # Or:
+    # "The Honorable ""Mystical ""Judge"", the Bringer of ""Flowers"
+
+    # STYLE GUIDE
+    # Prefix 1:
+        # (adjective ) or (The adjective )
+        # End with a space
+    # Prefix 2: 
+        # (adjective )
+        # End with a space
+    # Name:
+        # (noun)
+        # No spaces on either side
+    # Suffix 1:
+        # ( of adjective ) or (, the verber of )
+        # Space or comma on either side
+    # Suffix 2:
+        # (noun)
+        # No spaces on either side
+    
+    # Cards with fewer bells and whistles may cut out
+    # Prefix 2.
+    # They may also have a placeholder " of " for 
+    # Suffix 1, then a Suffix 2.
+
+    @property
+    def slots(self):
+        # Which row of each affix table the card was built from,
+        # (prefix1, prefix2, name, suffix1, suffix2). None if it was made by hand.
+        if self.card_id is None:
+            return None
+        return slotsFromCardId(self.card_id, self.content.sizes) #TUPLE OF 5 INTS
+
+    @property
+    def rows(self):
+        # The card's five AffixRows, in name order
+        if self.card_id is None:
+            return tuple(table[0] for table in self.content.tables)
+        return tuple(table[index] for table, index in zip(self.content.tables, self.slots))
+
+    @property
+    def prefix1(self):
+        return self.rows[0].text #STRING
+
+    @property
+    def prefix2(self):
+        return self.rows[1].text #STRING
+
+    @property
+    def name(self):
+        return self.rows[2].text #STRING
+
+    @property
+    def suffix1(self):
+        return self.rows[3].text #STRING
+
+    @property
+    def suffix2(self):
+        return self.rows[4].text #STRING
+
+    @property
+    def fullname(self):
+        # A string convenient for displaying to the user:
+        return "".join(row.text for row in self.rows)
+
+    @property
+    def fullnamelist(self):
+        # ...versus a list convenient for iterating through:
+        return [row.text for row in self.rows]
+
+    # Effects: Some strings representing what the
+    # card does. There is a dictionary of
+    # effects; each string can refer to a key
+    # for more information on what to do.
+    # 0: Generic/None
+    # 1: Damage
+    # 2: Defend
+    # 3: Heal
+    # 4: Boost own energy
+    # 5: Boost own deck
+    # 6: Reduce opponent energy
+    # 7: Reduce opponent deck
+    # 8: Debuff opponent damage
+    # 9: Debuff opponent defense
+    # 10: Debuff opponent heal
+    # 11: (May not be used) Debuff opponent energy effects
+    # 12: (May not be used) Debuff opponent deck effects
+    # 13: Buff own damage
+    # 14: Buff own defense
+    # 15: Buff own healing
+    # 16: (May not be used) Buff own energy effects
+    # 17: (May not be used) Buff own deck effects
+    @property
+    def effects(self):
+        effects = []
+        for row in self.rows:
+            effects.extend(row.effects)
+        return effects #LIST OF STRINGS
+
+    # Powers: The card does its effects with this much
+    # numerical magnitude, matching the index.
+    @property
+    def powers(self):
+        powers = []
+        for row in self.rows:
+            powers.extend(row.powers)
+        return powers #LIST OF INTS
+
+    @property
+    def ops(self):
+        if self._ops is None:
+            # Each row's effects were already compiled when the content was loaded
+            row_ops = self.content.derived("row_ops", buildRowOps)
+            if self.card_id is None:
+                slots = (0, 0, 0, 0, 0)
+            else:
+                slots = self.slots
+            ops = ()
+            for table_ops, index in zip(row_ops, slots):
+                ops += table_ops[index]
+            self._ops = ops
+        return self._ops #TUPLE OF (INT, INT)
+
+    def __str__(self):
+        # For printing the object itself
+        return self.fullname
+    
+    def __repr__(self):
+        # For printing a list of such objects
+        return self.fullname + " (" + str(self.cost) + ")"
+
+    def play(self, user, target):
+        # self is the card being played.
+        # user is the Player object using the card.
+        # target is the Player object they are fighting against.
+
+        # Go through the card's effects in order (buffs earlier in the
+        # name apply to damage later in the name) and let each effect's
+        # function do the appropriate adjustment to the numbers.
+        ops = self._ops
+        if ops is None:
+            ops = self.ops
+        for code, power in ops:
+            EFFECT_FUNCTIONS[code](power, user, target)
+
+def partsContent(texts, effects, powers, cost):
+    # A Content of one row per table for Card.fromParts(): 5 strings, 15
+    # effects and 15 powers (three per part), with the whole cost on the
+    # first row
+    tables = []
+    for s in range(5):
+        part_cost = cost if s == 0 else 0
+        tables.append((AffixRow(texts[s], tuple(effects[3 * s:3 * s + 3]), tuple(powers[3 * s:3 * s + 3]), part_cost),))
+    return Content(tuple(tables), 0)
+
+def compileEffects(effects, powers):
+    # Turns parallel lists of effect names and powers into the list of
+    # (effect code, power) pairs that Card.play() runs, in the same order.
+    # Empty and unknown effects do nothing, so they are dropped.
+    ops = []
+    for effect, power in zip(effects, powers):
+        code = EFFECT_CODES.get(effect, 0)
+        if code != 0:
+            ops.append((code, power))
+    return tuple(ops)
+
+
+# EFFECTS
+# There are a lot of possible effects to cover. Each one is a function
+# effect(power, user, target), and EFFECT_FUNCTIONS lists them by effect code.
+
+# 1: Damage
+def effectDamage(power, user, target):
+    # Attempt to reduce target's health by:
+    # this card's damage power + user's damage buff
+    # (cannot be less than 0)
+
+    # There are a few different cases.
+    # Case 1: No defense - just reduce health by the amount.
+    # Case 2: Some defense but not enough - destroy all defense
+    # and reduce health by what's left.
+    # Case 3: Enough defense - just reduce defense by the amount.
+
+    damage_amount = max( 0, power + user.buff_damage )
+
+    if target.defense <= 0:
+        target.health -= damage_amount
+
+    elif target.defense < damage_amount:
+        target.health -= damage_amount - target.defense
+        target.defense = 0
+
+    else:
+        target.defense -= damage_amount
+
+    return damage_amount
+
+# 2: Defense
+def effectDefense(power, user, target):
+    # Increase user's defense by:
+    # this card's defense power + user's defense buff
+    # (cannot be less than 0)
+    amount = max( 0, power + user.buff_defense )
+    user.defense += amount
+    return amount
+
+# 3: Healing
+def effectHealing(power, user, target):
+    # Increase user's health by:
+    # this card's healing power + user's healing buff
+    # (cannot be less than 0)
+    amount = max( 0, power + user.buff_healing )
+    user.health += amount
+    return amount
+
+# 4: Boost Energy
+def effectBoostEnergy(power, user, target):
+    # Increase user's energy by:
+    # this card's boost energy power + user's energy buff
+    # (cannot be less than 0)
+    amount = max( 0, power + user.buff_energy )
+    user.energy += amount
+    return amount
+
+# 5: Boost Deck
+def effectBoostDeck(power, user, target):
+    # Increase user's deck size by:
+    # this card's boost deck power + user's deck buff
+    # (cannot be less than 0)
+    amount = max( 0, power + user.buff_deck )
+    user.deck += amount
+    return amount
+
+# 6: Reduce Energy
+def effectReduceEnergy(power, user, target):
+    # Lower opponent's energy by:
+    # this card's reduce energy power + user's energy buff
+    # (cannot be less than 0)
+    amount = max( 0, power + user.buff_energy )
+    target.energy -= amount
+    return amount
+
+# 7: Reduce Deck
+def effectReduceDeck(power, user, target):
+    # Lower opponent's deck size by:
+    # this card's reduce deck power + user's deck buff
+    # (cannot be less than 0)
+    amount = max( 0, power + user.buff_deck )
+    target.deck -= amount
+    return amount
+
+# 8: Debuff Damage
+def effectDebuffDamage(power, user, target):
+    # Lower opponent's damage buff by this card's debuff damage power
+    target.buff_damage -= power
+    return power
+
+# 9: Debuff Defense
+def effectDebuffDefense(power, user, target):
+    # Lower opponent's defense buff by this card's debuff defense power
+    target.buff_defense -= power
+    return power
+
+# 10: Debuff Healing
+def effectDebuffHealing(power, user, target):
+    # Lower opponent's healing buff by this card's debuff healing power
+    target.buff_healing -= power
+    return power
+
+# 11: (May not be used) Debuff opponent energy effects
+def effectDebuffEnergy(power, user, target):
+    # Lower opponent's energy buff by this card's debuff energy power
+    target.buff_energy -= power
+    return power
+
+# 12: (May not be used) Debuff opponent deck effects
+def effectDebuffDeck(power, user, target):
+    # Lower opponent's deck buff by this card's debuff deck power
+    target.buff_deck -= power
+    return power
+
+# 13: Buff Damage
+def effectBuffDamage(power, user, target):
+    # Increase user's damage buff by this card's buff damage power
+    user.buff_damage += power
+    return power
+
+# 14: Buff Defense
+def effectBuffDefense(power, user, target):
+    # Increase user's defense buff by this card's buff defense power
+    user.buff_defense += power
+    return power
+
+# 15: Buff Healing
+def effectBuffHealing(power, user, target):
+    # Increase user's healing buff by this card's buff healing power
+    user.buff_healing += power
+    return power
+
+# 16: (May not be used) Buff own energy effects
+def effectBuffEnergy(power, user, target):
+    # Increase user's energy buff by this card's buff energy power
+    user.buff_energy += power
+    return power
+
+# 17: (May not be used) Buff own deck effects
+def effectBuffDeck(power, user, target):
+    # Increase user's deck buff by this card's buff deck power
+    user.buff_deck += power
+    return power
+
+# Index i holds the function for effect code i (see EFFECT_NAMES).
+# Code 0 never makes it into a card's ops. Each one returns the amount it
+# actually applied (after buffs), which only metrics.py looks at.
+EFFECT_FUNCTIONS = (
+    None, effectDamage, effectDefense, effectHealing, effectBoostEnergy,
+    effectBoostDeck, effectReduceEnergy, effectReduceDeck, effectDebuffDamage,
+    effectDebuffDefense, effectDebuffHealing, effectDebuffEnergy,
+    effectDebuffDeck, effectBuffDamage, effectBuffDefense, effectBuffHealing,
+    effectBuffEnergy, effectBuffDeck,
+)
+
+
+
+
+# We should also define what a player is.
+# There is one player vs another, playing cards
+# to buff and heal themselves, or damage and debuff
+# the opponent player. They can also affect number
+# of cards drawn and max energy per turn.
+
+# Whoever reduces the other player's health, energy, or deck
+# to 0 first wins.
+
+# Cards all cost energy. The more energy a player has, the more
+# cards, or the costlier cards, they can use every turn.
+
+# The numbers that make up a player's state, in the order snapshot() uses.
+PLAYER_FIELDS = ("health", "energy", "energy_current", "defense", "deck",
+    "buff_damage", "buff_defense", "buff_healing", "buff_energy", "buff_deck")
+
+class Player:
+    # AI search and what-if checks copy and restore players constantly,
+    # so a Player is just a fixed set of slots with a quick way to save
+    # and load all of its numbers at once.
+    __slots__ = PLAYER_FIELDS + ("perks",)
+
+    def __init__(self, health=30, energy=8, energy_current = 8,  deck=4, defense=0, buff_damage=0, buff_defense=0, buff_healing=0, buff_energy=0, buff_deck=0, perks=None):
+        # debuff_damage=0, debuff_defense=0, debuff_healing=0,  debuff_energy=0, debuff_deck=0, 
+        self.health = health # Default: 30
+        self.energy = energy # Default: 8
+        self.energy_current = energy_current # Default: same as energy
+        self.defense = defense # Default: 0
+        self.deck = deck # Default: 5
+        self.buff_damage = buff_damage # Default: 0
+        self.buff_defense = buff_defense # Default: 0
+        self.buff_healing = buff_healing # Default: 0
+        self.buff_energy = buff_energy # Default: 0
+        self.buff_deck = buff_deck # Default: 0
+        if perks is None:
+            perks = [] # A new list for every player, so they don't share one
+        self.perks = perks # Default: []
+
+    def snapshot(self):
+        # All the numbers in PLAYER_FIELDS as one tuple. It's hashable, so it
+        # doubles as a key for the player's state (see stateKey()).
+        # Perks aren't included; cards never change them.
+        return _player_state(self)
+
+    def restore(self, state):
+        # Puts back the numbers from snapshot()
+        (self.health, self.energy, self.energy_current, self.defense, self.deck,
+            self.buff_damage, self.buff_defense, self.buff_healing, self.buff_energy, self.buff_deck) = state
+
+    def stateKey(self):
+        return _player_state(self)
+
+    def clone(self):
+        # A separate Player with the same numbers and perks
+        other = Player.__new__(Player)
+        other.restore(_player_state(self))
+        other.perks = list(self.perks)
+        return other
+
+    def __getstate__(self):
+        return (_player_state(self), self.perks)
+
+    def __setstate__(self, state):
+        self.restore(state[0])
+        self.perks = state[1]
+
+    def __str__(self):
+        return_me = "Health: " + str(self.health) + "\nEnergy: " + str(self.energy) + \
+            "\nDefense: " + str(self.defense) + "\nDeck: " + str(self.deck) + \
+            "\nDamage Buff: " + str(self.buff_damage) + \
+            "\nDefense Buff: " + str(self.buff_defense) + \
+            "\nHealing Buff: " + str(self.buff_healing)
+        return return_me
+
+    def isDefeated(self):
+        # Whoever runs out of health, energy, or deck loses.
+        return self.health <= 0 or self.energy <= 0 or self.deck <= 0
+
+_player_state = operator.attrgetter(*PLAYER_FIELDS)
+
+
+# There should be a function that generates a random card.
+# It returns that card as an object.
+# It will probably have a database of many possible name pieces
+# to put together. Those name pieces determine certain effects
+# which are simply known to the program.
+# There should likely be a dictionary (or five) with name pieces 
+# as keys and effects as values.
+
+
+
+# The five affix tables, in the order their words appear in a card's name.
+# Each one is read from its own CSV file.
+SLOTS = ("prefix1", "prefix2", "name", "suffix1", "suffix2")
+SLOT_FILES = {
+    "prefix1": "prefix1.csv",
+    "prefix2": "prefix2.csv",
+    "name": "names.csv",
+    "suffix1": "suffix1.csv",
+    "suffix2": "suffix2.csv",
+}
+
+# The CSV files live at the top of the repository, next to the package.
+CONTENT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# One row of an affix table. Rows are shared by every card that uses them,
+# so they are tuples and can't be changed by accident.
+# text: STRING, effects: TUPLE OF 3 STRINGS, powers: TUPLE OF 3 INTS, cost: INT
+AffixRow = namedtuple("AffixRow", ["text", "effects", "powers", "cost"])
+
+# RARITY
+# A file can have a WEIGHT or a RARITY column after COST, saying how often
+# each row is picked compared to the others in its table. WEIGHT is a whole
+# number (empty means 1); RARITY is one of these tiers or a whole number
+# (empty means common). A row with weight 0 is never picked at random.
+# Weights only change how often rows come up, not what the cards are, so
+# they're kept apart from the rows themselves.
+RARITY_WEIGHTS = {"common": 100, "uncommon": 40, "rare": 10, "epic": 3, "legendary": 1}
+
+def parseWeight(text, column, line):
+    text = text.strip()
+    if column == "RARITY":
+        if text == "":
+            return RARITY_WEIGHTS["common"]
+        if text.lower() in RARITY_WEIGHTS:
+            return RARITY_WEIGHTS[text.lower()]
+    elif text == "":
+        return 1
+    try:
+        weight = int(text)
+    except ValueError:
+        raise ValueError("line %i: %s should be a whole number%s, not %r" % (
+            line, column, " or one of " + ", ".join(RARITY_WEIGHTS) if column == "RARITY" else "", text)) from None
+    if weight < 0:
+        raise ValueError("line %i: %s can't be negative" % (line, column))
+    return weight
+
+def parseAffixTable(lines):
+    # lines is anything csv.reader can iterate over (an open file, a list of strings...)
+    # Returns (rows, weights). weights is None when every row is as likely
+    # as the others, which is also what a file without weights means.
+    reader = csv.reader(lines, delimiter=',')
+    titles = [title.strip().upper() for title in next(reader, [])] # First row just has titles
+    weight_columns = [column for column in ("WEIGHT", "RARITY") if column in titles]
+    if len(weight_columns) > 1:
+        raise ValueError("a table can have a WEIGHT or a RARITY column, not both")
+    weight_index = titles.index(weight_columns[0]) if weight_columns else None
+
+    rows = []
+    weights = []
+    for line, row in enumerate(reader, 2):
+        if not row:
+            continue
+        # Columns: text, 3 effects, 3 powers, cost.
+        # Account for some powers being empty strings.
+        powers = tuple(int(power) if power != "" else 0 for power in row[4:7])
+        # Interned, so every copy of the same word is one shared string
+        effects = tuple(sys.intern(effect) for effect in row[1:4])
+        rows.append(AffixRow(sys.intern(row[0]), effects, powers, int(row[7])))
+        if weight_index is not None:
+            weights.append(parseWeight(row[weight_index] if weight_index < len(row) else "", weight_columns[0], line))
+
+    if weight_index is not None and rows and sum(weights) == 0:
+        raise ValueError("every row has %s 0" % weight_columns[0])
+    if weight_index is None or len(set(weights)) <= 1:
+        weights = None
+    else:
+        weights = tuple(weights)
+    return tuple(rows), weights
+
+def parseAffixLines(lines):
+    # Just the rows of parseAffixTable()
+    return parseAffixTable(lines)[0]
+
+
+class Content:
+    # A snapshot of all five affix tables. It never changes once made;
+    # when a CSV file is edited, the ContentStore makes a new snapshot instead.
+    def __init__(self, tables, version, weights=None):
+        self.tables = tables # TUPLE OF 5 TUPLES OF AffixRow, in SLOTS order
+        self.version = version # INT, goes up by one every time something is reloaded
+        self.sizes = tuple(len(table) for table in tables) # Row count of each table
+        # Each table's row weights (see RARITY), or None where every row is
+        # as likely as the others
+        if weights is None:
+            weights = (None,) * len(tables)
+        self.weights = weights
+        self.weighted = any(table_weights is not None for table_weights in weights)
+        self._derived = {}
+
+    def derived(self, key, build):
+        # Anything computed from the tables (columns, lookup arrays...) can be
+        # cached here with build(content). It gets thrown away along with the
+        # snapshot when the files change, so it never goes stale.
+        try:
+            return self._derived[key]
+        except KeyError:
+            value = self._derived[key] = build(self)
+            return value
+
+
+class ContentStore:
+    # Parses the five CSV files once and hands out the same Content snapshot
+    # until one of the files changes on disk.
+    def __init__(self, directory=CONTENT_DIR, check_interval=1.0):
+        self.directory = directory
+        # Looking at the files costs a few system calls, so only do it
+        # this often (in seconds). 0 means check on every call.
+        self.check_interval = check_interval
+        self._content = None
+        self._stamps = {} # slot -> (mtime, size, hash) of the file last parsed
+        self._last_check = 0.0
+
+    def get(self):
+        now = time.monotonic()
+        if self._content is None or now - self._last_check >= self.check_interval:
+            self._last_check = now
+            self.refresh()
+        return self._content
+
+    def refresh(self):
+        # Compare every file against what we parsed last time. A new mtime only
+        # makes us hash the file; it is re-parsed only if the hash changed too.
+        if self._content is not None:
+            tables = list(self._content.tables)
+            weights = list(self._content.weights)
+        else:
+            tables = [None] * len(SLOTS)
+            weights = [None] * len(SLOTS)
+        changed = False
+        # New stamps are only kept once every file has parsed. If one
+        # fails, the files before it have to be parsed again next time,
+        # or their edits would be skipped for good.
+        stamps = dict(self._stamps)
+
+        for i, slot in enumerate(SLOTS):
+            path = os.path.join(self.directory, SLOT_FILES[slot])
+            stat = os.stat(path)
+            stamp = stamps.get(slot)
+            if stamp is not None and stamp[0] == stat.st_mtime_ns and stamp[1] == stat.st_size:
+                continue
+
+            with open(path, "rb") as affix_file:
+                data = affix_file.read()
+            digest = hashlib.sha1(data).hexdigest()
+            if stamp is None or stamp[2] != digest:
+                try:
+                    tables[i], weights[i] = parseAffixTable(data.decode("utf-8").splitlines())
+                except ValueError as error:
+                    raise ValueError("%s: %s" % (SLOT_FILES[slot], error)) from None
+                changed = True
+            stamps[slot] = (stat.st_mtime_ns, stat.st_size, digest)
+
+        if changed:
+            version = 1 if self._content is None else self._content.version + 1
+            self._content = Content(tuple(tables), version, tuple(weights))
+        self._stamps = stamps
+        return self._content
+
+# The one store everything in this process shares.
+content_store = ContentStore()
+
+def getContent():
+    return content_store.get()
+
+
+def buildColumns(content):
+    # The old layout: for each file, a list of columns
+    # [texts, effects 1, effects 2, effects 3, powers 1, powers 2, powers 3, costs]
+    columns = []
+    for table in content.tables:
+        columns.append((
+            tuple(row.text for row in table),
+            tuple(row.effects[0] for row in table),
+            tuple(row.effects[1] for row in table),
+            tuple(row.effects[2] for row in table),
+            tuple(row.powers[0] for row in table),
+            tuple(row.powers[1] for row in table),
+            tuple(row.powers[2] for row in table),
+            tuple(row.cost for row in table),
+        ))
+    prefix1_all, prefix2_all, names_all, suffix1_all, suffix2_all = columns
+    return (names_all, prefix1_all, prefix2_all, suffix1_all, suffix2_all)
+
+def CollectFromFiles():
+    # Returns (names_all, prefix1_all, prefix2_all, suffix1_all, suffix2_all),
+    # each laid out like buildColumns() describes. The files are only read
+    # by the content store, and the columns are shared, so they are tuples.
+    return getContent().derived("columns", buildColumns)
+
+def buildRowOps(content):
+    # Every row's effects compiled for Card.play(), table by table.
+    return tuple(tuple(compileEffects(row.effects, row.powers) for row in table) for table in content.tables)
+
+def CardFromSlots(slots, content=None):
+    # slots holds the row picked from each table, in SLOTS order:
+    # (prefix1, prefix2, name, suffix1, suffix2)
+    if content is None:
+        content = getContent()
+    tables = content.tables
+    cost = tables[0][slots[0]].cost + tables[1][slots[1]].cost + tables[2][slots[2]].cost + tables[3][slots[3]].cost + tables[4][slots[4]].cost
+    return Card(content, cardIdFromSlots(slots, content.sizes), cost)
+
+def buildCostHalves(content):
+    # Card costs split at the name: the first two tables' rows summed for
+    # every (prefix1, prefix2), and the last three's for every (name,
+    # suffix1, suffix2), both in card id order. A card's cost is then one
+    # divmod and two lookups, without working out its slots.
+    def costColumn(tables):
+        column = [0]
+        for table in tables:
+            column = [total + row.cost for total in column for row in table]
+        return tuple(column)
+    lower_costs = costColumn(content.tables[2:])
+    return len(lower_costs), costColumn(content.tables[:2]), lower_costs
+
+def CardFromId(card_id, content=None):
+    if content is None:
+        content = getContent()
+    split, upper_costs, lower_costs = content.derived("cost_halves", buildCostHalves)
+    upper, lower = divmod(card_id, split)
+    return Card(content, card_id, upper_costs[upper] + lower_costs[lower])
+
+def cardFromPickle(card_id, fingerprint):
+    # Unpickles a Card (see Card.__reduce__()). A card id means a
+    # different card once the tables change, so that's refused.
+    from randomcards import cardindex # It imports this module
+    content = getContent()
+    if cardindex.contentFingerprint(content) != fingerprint:
+        raise ValueError("the card was pickled with different tables than the ones loaded")
+    return CardFromId(card_id, content)
+
+
+# CARD IDS
+# Every possible card is one number: its slot rows read as the digits of a
+# mixed-radix number, prefix1 first, where each digit goes up to the size
+# of its table. sizes is Content.sizes.
+
+def cardIdFromSlots(slots, sizes):
+    card_id = 0
+    for index, size in zip(slots, sizes):
+        card_id = card_id * size + index
+    return card_id
+
+def slotsFromCardId(card_id, sizes):
+    slots = [0] * len(sizes)
+    for s in range(len(sizes) - 1, -1, -1):
+        card_id, slots[s] = divmod(card_id, sizes[s])
+    return tuple(slots)
+
+def cardCount(sizes):
+    # How many different cards the tables can make
+    count = 1
+    for size in sizes:
+        count *= size
+    return count
+
+# ALIAS TABLES
+# Picking a row by weight in constant time (Walker's alias method, built
+# the way Vose describes). A table of n rows is cut into n columns of
+# total units each, where total is the sum of the (reduced) weights. Column
+# i holds thresholds[i] units of row i and the rest of aliases[i]. One
+# random number below n * total picks a column and a unit in it, so a row
+# comes up exactly weight/total of the time, with whole numbers all the way.
+AliasTable = namedtuple("AliasTable", ["span", "total", "thresholds", "aliases"])
+
+def buildAliasTable(weights):
+    divisor = math.gcd(*weights)
+    weights = [weight // divisor for weight in weights]
+    n = len(weights)
+    total = sum(weights)
+
+    # Every row's units, n times over so the columns come out whole
+    units = [weight * n for weight in weights]
+    thresholds = [total] * n
+    aliases = list(range(n))
+    small = [i for i in range(n) if units[i] < total]
+    large = [i for i in range(n) if units[i] >= total]
+    while small and large:
+        # Top up a column that's short with units from a row that has too many
+        short, spare = small.pop(), large.pop()
+        thresholds[short] = units[short]
+        aliases[short] = spare
+        units[spare] -= total - units[short]
+        (small if units[spare] < total else large).append(spare)
+    # Whatever is left has exactly total units: a column of its own
+    return AliasTable(n * total, total, tuple(thresholds), tuple(aliases))
+
+def buildAliasTables(content):
+    # One AliasTable per table, None for the tables without weights
+    return tuple(None if weights is None else buildAliasTable(weights) for weights in content.weights)
+
+def aliasPick(table, rng):
+    # One row number from an AliasTable
+    column, unit = divmod(rng.randrange(table.span), table.total)
+    return column if unit < table.thresholds[column] else table.aliases[column]
+
+def weightedSlots(content, rng):
+    # CardMakerRandom()'s picks when some tables have weights: one draw
+    # per table, in the same order as the uniform picks
+    alias_tables = content.derived("alias_tables", buildAliasTables)
+    slots = [0] * len(SLOTS)
+    for s in (2, 0, 1, 3, 4):
+        table = alias_tables[s]
+        slots[s] = rng.randrange(0, content.sizes[s]) if table is None else aliasPick(table, rng)
+    return slots
+
+def CardMakerRandom(rng=random):
+    # rng is where the random numbers come from: the random module itself
+    # by default, or something like random.Random(seed).
+    content = getContent()
+    if content.weighted:
+        return CardFromSlots(weightedSlots(content, rng), content)
+    sizes = content.sizes
+
+    # Pick a random row from each table. The name is picked first, then the
+    # prefixes and suffixes; keep this order so seeded runs give the same cards.
+    name_selection = rng.randrange(0, sizes[2])
+    prefix1_selection = rng.randrange(0, sizes[0])
+    prefix2_selection = rng.randrange(0, sizes[1])
+    suffix1_selection = rng.randrange(0, sizes[3])
+    suffix2_selection = rng.randrange(0, sizes[4])
+
+    return CardFromSlots((prefix1_selection, prefix2_selection, name_selection, suffix1_selection, suffix2_selection), content)
+
+def buildSlotColumns(content):
+    # For each table: (effect codes, powers, costs), where effect codes and
+    # powers hold 3 columns each (one per EFFECT/POWER column in the file).
+    # Handy for looking up many rows at once.
+    columns = []
+    for table in content.tables:
+        codes = tuple(tuple(EFFECT_CODES.get(row.effects[j], 0) for row in table) for j in range(3))
+        powers = tuple(tuple(row.powers[j] for row in table) for j in range(3))
+        costs = tuple(row.cost for row in table)
+        columns.append((codes, powers, costs))
+    return tuple(columns)
+
+def gatherColumn(column, picks):
+    # Returns an array holding column[pick] for every pick.
+    # When the picks and the values all fit in a byte, bytes.translate()
+    # does the whole lookup in C, which is much faster than map().
+    if picks.typecode == "B" and len(column) <= 256:
+        if min(column) >= 0 and max(column) < 256:
+            typecode = "B"
+        elif min(column) >= -128 and max(column) < 128:
+            typecode = "b"
+        else:
+            typecode = None
+        if typecode is not None:
+            lookup = bytes(value & 0xFF for value in column).ljust(256, b"\0")
+            result = array(typecode)
+            result.frombytes(picks.tobytes().translate(lookup))
+            return result
+    return array("h", map(column.__getitem__, picks))
+
+class CardBatch:
+    # Lots of cards at once, stored column by column instead of as Card objects.
+    # Card i of the batch is made of:
+    #   slots[s][i]: the row picked from table s (SLOTS order)
+    #   costs[i]: its total cost
+    #   effects[k][i], powers[k][i]: its k'th effect (0-14, same order as
+    #   Card.effects) as an effect code, and the matching power
+    # Card objects are only made when asked for with card() or cards().
+    def __init__(self, content, slots):
+        self.content = content
+        self.slots = slots # LIST OF 5 ARRAYS
+        self.size = len(slots[0])
+
+        slot_columns = content.derived("slot_columns", buildSlotColumns)
+
+        self.effects = [] # LIST OF 15 ARRAYS
+        self.powers = [] # LIST OF 15 ARRAYS
+        cost_columns = []
+        for picks, (codes, powers, costs) in zip(slots, slot_columns):
+            for j in range(3):
+                self.effects.append(gatherColumn(codes[j], picks))
+                self.powers.append(gatherColumn(powers[j], picks))
+            cost_columns.append(gatherColumn(costs, picks))
+        self.costs = array("h", map(sum, zip(*cost_columns))) # ARRAY OF INTS
+
+    def __len__(self):
+        return self.size
+
+    def card(self, i):
+        return CardFromSlots(tuple(picks[i] for picks in self.slots), self.content)
+
+    def cards(self):
+        return [CardFromSlots(slots, self.content) for slots in zip(*self.slots)]
+
+def CardBatchMakerRandom(n, rng=random):
+    # Makes n random cards as one CardBatch. Each slot is picked like
+    # CardMakerRandom() does (by weight, for tables that have them), but
+    # all n picks for a table are drawn in one call. rng is anything with
+    # choices(), like the random module itself or a random.Random(seed).
+    # A streams.StreamRandom draws them straight from its stream's bytes,
+    # which is several times faster.
+    content = getContent()
+    alias_tables = content.derived("alias_tables", buildAliasTables)
+    many = getattr(rng, "randbelowMany", None)
+    slots = []
+    for size, table in zip(content.sizes, alias_tables):
+        span = size if table is None else table.span
+        if many is not None:
+            picks = many(span, n)
+        else:
+            picks = rng.choices(range(span), k=n)
+        if table is not None:
+            # Each pick is a column and a unit in it; see buildAliasTable()
+            thresholds, aliases = table.thresholds, table.aliases
+            picks = [column if unit < thresholds[column] else aliases[column] for column, unit in map(divmod, picks, repeat(table.total, n))]
+        if table is not None or many is None:
+            # Row numbers fit in a byte for tables up to 256 rows
+            picks = array("B" if size <= 256 else "H", picks)
+        slots.append(picks)
+    return CardBatch(content, slots)
+
+# TESTING: Comment out at the end
+# Card generation: Passed
+#CardMakerRandom()
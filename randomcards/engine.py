@@ -0,0 +1,171 @@
+# BATTLE ENGINE
+# The rules of a battle, with nothing from tkinter in them, so battles can
+# run without a window (simulations, worker processes...). The GUI in
+# gui.py is just one more user of these.
+
+import random
+import time
+
+from randomcards.core import CardMakerRandom
+from randomcards.events import DEBUG, INFO, NULL_SINK, BattleWon, CardPlayed, DamageApplied, TurnEnded
+
+# A policy decides what one side does on its turn. It gets called as
+# policy(hand, user, target) before every card, and returns the index of
+# the card in hand to play next, or None to end the turn early.
+
+# A metrics.Metrics while metrics are switched on (see
+# metrics.enableMetrics()), None the rest of the time. Battles only
+# check it once per card and once per turn phase, so leaving it off costs
+# next to nothing.
+metrics = None
+
+def playFirstPolicy(hand, user, target):
+    # Plays cards in the order they were drawn until the turn runs out.
+    # This is what the computer opponent has always done.
+    return 0
+
+class Battle:
+    # The state of one battle. Turns go player, opponent, player...
+    # Each turn: beginTurn(), then play() cards from hand while canPlay(),
+    # then endTurn(), which also decides whether someone has won.
+    def __init__(self, player, opponent, rng=random, log=None, sink=None):
+        self.player = player
+        self.opponent = opponent
+        self.rng = rng # Where cards come from; see CardMakerRandom()
+        self.log = log # A battlelog.BattleLogWriter to record the battle in, or None
+        self.sink = NULL_SINK if sink is None else sink # Gets the battle's events (see events.py)
+
+        self.player_turn = True # When false, it's the opponent's turn
+        self.hand = [] # Cards the side whose turn it is can still play
+        self.plays_this_turn = 0
+        self.round = 0 # Goes up at the start of every player turn
+        self.winner = None # "player" or "opponent" once the battle is over
+        self.player_cards_played = 0
+        self.opponent_cards_played = 0
+
+        # Energy carries over between turns (including any "debt"),
+        # starting from nothing.
+        player.energy_current = 0
+        opponent.energy_current = 0
+
+    def sides(self):
+        # (user, target) for whoever's turn it is
+        if self.player_turn:
+            return self.player, self.opponent
+        return self.opponent, self.player
+
+    def side(self):
+        # "player" or "opponent": whose turn it is
+        return "player" if self.player_turn else "opponent"
+
+    def beginTurn(self, hand=None):
+        # hand: the cards to hold this turn instead of drawing new ones
+        # (replays use this)
+        user, target = self.sides()
+        if self.player_turn:
+            self.round += 1
+
+        user.defense = 0 # Defense only lasts one turn and should be reset
+        user.energy_current += user.energy
+
+        # One new card for each deck slot
+        if hand is None:
+            hand = [CardMakerRandom(self.rng) for i in range(user.deck)]
+        self.hand = hand
+        self.plays_this_turn = 0
+
+    def canPlay(self):
+        # The first card of a turn can always be played, even in energy debt.
+        # After that, the turn is over once energy or cards run out.
+        if len(self.hand) <= 0:
+            return False
+        return self.plays_this_turn == 0 or self.sides()[0].energy_current > 0
+
+    def play(self, index):
+        # Play the card, subtract the energy cost, and remove it from the hand.
+        user, target = self.sides()
+        if self.log is not None:
+            # Before anything changes, so a card the log can't record
+            # leaves the battle as it was
+            self.log.checkCard(self.hand[index])
+        card = self.hand.pop(index)
+        sink = self.sink
+        if sink.level <= INFO:
+            sink.emit(CardPlayed(self.side(), card))
+            defense, health = target.defense, target.health
+        if metrics is None:
+            card.play(user, target)
+        else:
+            metrics.playCard(card, user, target)
+        user.energy_current -= card.cost
+        if sink.level <= DEBUG and (defense, health) != (target.defense, target.health):
+            sink.emit(DamageApplied(self.side(), card, defense - target.defense, health - target.health))
+
+        self.plays_this_turn += 1
+        if self.player_turn:
+            self.player_cards_played += 1
+        else:
+            self.opponent_cards_played += 1
+        if self.log is not None:
+            self.log.play(self, card) # Only once the card has been played
+        return card
+
+    def endTurn(self):
+        # Between turns: check for end of battle. Only the side that just
+        # played can win here, same as it has always worked.
+        user, target = self.sides()
+        if target.isDefeated():
+            self.winner = self.side()
+
+        sink = self.sink
+        if sink.level <= DEBUG:
+            sink.emit(TurnEnded(self.side(), self.round, self.player.snapshot(), self.opponent.snapshot()))
+        if self.winner is not None and sink.level <= INFO:
+            sink.emit(BattleWon(self.winner, self.round))
+        if self.log is not None:
+            self.log.endTurn(self)
+        self.hand = []
+        self.player_turn = not self.player_turn
+        return self.winner
+
+def simulateBattle(player, opponent, player_policy=playFirstPolicy, opponent_policy=playFirstPolicy, rng=random, max_rounds=1000, log=None, sink=None):
+    # Runs a whole battle and returns the finished Battle.
+    # If nobody has won after max_rounds rounds, battle.winner stays None.
+    # max_rounds=None lets it go on forever.
+    # log: a battlelog.BattleLogWriter to record the battle in
+    # sink: where the battle's events go (see events.py); none by default
+    battle = Battle(player, opponent, rng, log, sink)
+    if log is not None:
+        log.beginBattle(battle)
+    timer = metrics # Fixed for the whole battle, even if switched in between
+
+    while battle.winner is None:
+        if battle.player_turn and max_rounds is not None and battle.round >= max_rounds:
+            break
+
+        if timer is not None:
+            start = time.perf_counter()
+        battle.beginTurn()
+        if timer is not None:
+            start = timer.lap("hand_generation", start)
+
+        policy = player_policy if battle.player_turn else opponent_policy
+        user, target = battle.sides()
+
+        while battle.canPlay():
+            index = policy(battle.hand, user, target)
+            if index is None:
+                break
+            battle.play(index)
+        if timer is not None:
+            start = timer.lap("player_phase" if battle.player_turn else "opponent_phase", start)
+
+        battle.endTurn()
+        if timer is not None:
+            timer.lap("end_checks", start)
+
+    if timer is not None:
+        timer.battleOver(battle)
+    if log is not None:
+        log.endBattle(battle)
+    return battle
@@ -0,0 +1,115 @@
+# What happens in a battle, as typed events instead of print() calls.
+#
+# A Battle hands its events to a sink (Battle(..., sink=...)). Events are
+# namedtuples holding the numbers and cards, not text; a sink only calls
+# event.text() for events it actually shows, so nothing is formatted for
+# nobody.
+#
+# Every event has a level, as in the logging module, and every sink has
+# the lowest level it wants. The Battle checks sink.level before it even
+# builds an event, so with the NULL_SINK (the default) an event costs one
+# comparison and nothing else:
+#     INFO   CardPlayed, BattleWon, and the GUI's HandShown and BattleStarted
+#     DEBUG  DamageApplied, TurnEnded (with both players' numbers)
+#
+#     battle = engine.simulateBattle(player, opponent, sink=events.PrintSink(events.DEBUG))
+
+import sys
+from collections import namedtuple
+
+from randomcards import core
+
+DEBUG = 10
+INFO = 20
+SILENT = 100 # Above every event: a sink at this level wants nothing
+
+SIDE_NAMES = {"player": "Player", "opponent": "Opponent"}
+
+
+def statusText(state):
+    # A PLAYER_FIELDS tuple (from Player.snapshot()) the way print(player)
+    # shows it
+    player = core.Player.__new__(core.Player)
+    player.restore(state)
+    return str(player)
+
+
+class BattleStarted(namedtuple("BattleStarted", "seed")):
+    __slots__ = ()
+    level = INFO
+
+    def text(self):
+        return "Battle seed: " + str(self.seed)
+
+class HandShown(namedtuple("HandShown", "hand energy")):
+    # The player is asked to pick from hand
+    __slots__ = ()
+    level = INFO
+
+    def text(self):
+        return "Your cards: %r\nYou have %i cards and %i energy available." % (self.hand, len(self.hand), self.energy)
+
+class CardPlayed(namedtuple("CardPlayed", "side card")):
+    # side ("player" or "opponent") is about to play card
+    __slots__ = ()
+    level = INFO
+
+    def text(self):
+        return SIDE_NAMES[self.side] + " will play: " + str(self.card)
+
+class DamageApplied(namedtuple("DamageApplied", "side card defense_lost health_lost")):
+    # What side's card took off the other side's defense and health
+    __slots__ = ()
+    level = DEBUG
+
+    def text(self):
+        return "%s's %s dealt %i damage (%i to defense, %i to health)" % (
+            SIDE_NAMES[self.side], self.card, self.defense_lost + self.health_lost, self.defense_lost, self.health_lost)
+
+class TurnEnded(namedtuple("TurnEnded", "side round player opponent")):
+    # player and opponent are the two sides' snapshot()s as the turn ends
+    __slots__ = ()
+    level = DEBUG
+
+    def text(self):
+        return "End of %s turn %i. Player status:\n%s\nOpponent status:\n%s" % (
+            "the player's" if self.side == "player" else "the opponent's", self.round, statusText(self.player), statusText(self.opponent))
+
+class BattleWon(namedtuple("BattleWon", "winner round")):
+    __slots__ = ()
+    level = INFO
+
+    def text(self):
+        return "You win!" if self.winner == "player" else "Your opponent wins!"
+
+
+class NullSink:
+    # Takes nothing. Its level is above every event's, so battles never
+    # build an event for it in the first place.
+    level = SILENT
+
+    def emit(self, event):
+        pass
+
+NULL_SINK = NullSink()
+
+class PrintSink:
+    # Prints the text of every event at level or above to file (default:
+    # whatever sys.stdout is at the time)
+    def __init__(self, level=INFO, file=None):
+        self.level = level
+        self.file = file
+
+    def emit(self, event):
+        if event.level >= self.level:
+            print(event.text(), file=self.file if self.file is not None else sys.stdout)
+
+class ListSink:
+    # Keeps the events themselves, for looking at afterwards
+    def __init__(self, level=DEBUG):
+        self.level = level
+        self.events = []
+
+    def emit(self, event):
+        if event.level >= self.level:
+            self.events.append(event)
@@ -0,0 +1,649 @@
+# The tkinter window: the player's cards as buttons, both sides' stats,
+# and a battle that runs off the window's event loop (see GuiBattle).
+# Nothing imports this module until the window is wanted, so the engine
+# and tools start without loading tkinter at all.
+#
+# Run it with:
+#     python -m randomcards play
+
+import operator
+import os
+import queue
+import threading
+import tkinter
+import tkinter.font
+import traceback
+
+from randomcards import events, streams
+from randomcards.core import CardMakerRandom, Player
+from randomcards.engine import Battle, playFirstPolicy
+
+# What each stat label shows, top to bottom: (Player fields, text)
+STAT_LABELS = (
+    (("health",), "Health: %i"),
+    (("energy_current", "energy"), "Energy: %i/%i"),
+    (("defense",), "Defense: %i"),
+    (("deck",), "Deck: %i"),
+    (("buff_damage",), "Damage Buff: %i"),
+    (("buff_defense",), "Defense Buff: %i"),
+    (("buff_healing",), "Healing Buff: %i"),
+)
+
+class LabelBinding:
+    # Keeps a label showing some of a player's fields, e.g.
+    # LabelBinding(label, player, ("energy_current", "energy"), "Energy: %i/%i").
+    # refresh() only reconfigures the label if one of those fields changed
+    # since the last time, so calling it often is cheap.
+    def __init__(self, label, player, fields, text):
+        self.label = label
+        self.player = player
+        self.get = operator.attrgetter(*fields) # One value, or a tuple of them
+        self.text = text
+        self.shown = None # The values on the label right now
+
+    def refresh(self):
+        values = self.get(self.player)
+        if values != self.shown:
+            self.label.configure(text = self.text % values)
+            self.shown = values
+
+label_bindings = [] # One per stat label, made along with the labels
+
+def updateLabels():
+    # Some global TKinter labels will need to be updated too.
+    # Only the ones whose numbers changed get touched.
+    for binding in label_bindings:
+        binding.refresh()
+
+# Where the GUI's battles send their events: the cards played, the
+# player's hand and who won, printed to the console
+event_sink = events.PrintSink(events.INFO)
+
+# The singleCardTest*() functions show everything, statuses included
+test_sink = events.PrintSink(events.DEBUG)
+
+def playTestCards(player, opponent):
+    # One random card each, player first, showing the status after each
+    player_card = CardMakerRandom()
+    opponent_card = CardMakerRandom()
+
+    test_sink.emit(events.CardPlayed("player", player_card))
+    player_card.play(player, opponent)
+    test_sink.emit(events.TurnEnded("player", 1, player.snapshot(), opponent.snapshot()))
+
+    test_sink.emit(events.CardPlayed("opponent", opponent_card))
+    opponent_card.play(opponent, player)
+    test_sink.emit(events.TurnEnded("opponent", 1, player.snapshot(), opponent.snapshot()))
+
+# Have a player and opponent play
+# single cards against each other: Passed
+def singleCardTest():
+
+
+    player = Player()
+    opponent = Player()
+
+    playTestCards(player, opponent)
+
+
+def singleCardTestPersistent(player, opponent):
+
+
+    # player and opponent are Player objects
+
+    playTestCards(player, opponent)
+
+    # Make sure to preserve these in a variable somewhere!
+    return player, opponent
+
+def singleCardTestGlobal():
+    # Inform the function that it should use the external/global
+    # variable when = is used.
+    # Apparently it also preserves progress when play() is used.
+    global player
+    global opponent
+
+    # Some global TKinter labels will need to be updated too.
+    """ 
+    global player_health
+    global player_energy
+    global player_defense
+    global player_deck
+    global player_buff_damage
+    global player_buff_defense
+    global player_buff_healing
+
+    global opponent_health
+    global opponent_energy
+    global opponent_defense
+    global opponent_deck
+    global opponent_buff_damage
+    global opponent_buff_defense
+    global opponent_buff_healing
+    """
+
+    # player and opponent are Player objects
+
+    playTestCards(player, opponent)
+
+    # UPDATE TKINTER LABELS
+    """
+    player_health.configure(text = "Health: " + str(player.health))
+    player_energy.configure(text = "Energy: " + str(player.energy))
+    player_defense.configure(text = "Defense: " + str(player.defense))
+    player_deck.configure(text = "Deck: " + str(player.deck))
+    player_buff_damage.configure(text = "Damage Buff: " + str(player.buff_damage))
+    player_buff_defense.configure(text = "Defense Buff: " + str(player.buff_defense))
+    player_buff_healing.configure(text = "Healing Buff: " + str(player.buff_healing))
+
+    opponent_health.configure(text = "Health: " + str(opponent.health))
+    opponent_energy.configure(text = "Energy: " + str(opponent.energy))
+    opponent_defense.configure(text = "Defense: " + str(opponent.defense))
+    opponent_deck.configure(text = "Deck: " + str(opponent.deck))
+    opponent_buff_damage.configure(text = "Damage Buff: " + str(opponent.buff_damage))
+    opponent_buff_defense.configure(text = "Defense Buff: " + str(opponent.buff_defense))
+    opponent_buff_healing.configure(text = "Healing Buff: " + str(opponent.buff_healing))
+    """
+    updateLabels()
+
+# These are set up once the window is made (see launch()).
+main = None # The tkinter.Tk window
+player = None # The Player at the bottom left, kept between battles
+opponent = None # The Player at the bottom right, kept between battles
+battle_button = None # "Begin!", until a battle starts
+end_button = None # "End Turn"
+card_buttons = None # The CardButtonPool for frame_cards
+gui_battle = None # The GuiBattle being played
+worker = None # The BackgroundWorker the opponent thinks on
+progress = None # The CanvasProgress in the middle of the window
+
+# How long to wait between the opponent's cards, in milliseconds. The
+# window keeps redrawing and taking clicks in between.
+OPPONENT_CARD_DELAY = 50
+
+def pressEndButton():
+    if gui_battle is not None:
+        gui_battle.endButton()
+
+def pressCardButton(button):
+    if gui_battle is not None:
+        gui_battle.cardButton(button)
+
+class CardButtonPool:
+    # The card buttons in a frame. Buttons are kept when they go off screen
+    # and relabelled for the next hand, instead of being destroyed and made
+    # again every turn.
+    def __init__(self, frame):
+        self.frame = frame
+        self.buttons = [] # Every button made so far
+        self.shown = [] # The ones on screen, in order
+
+    def show(self, hand):
+        # One button per card in hand, in order
+        for b in self.shown:
+            b.pack_forget()
+        while len(self.buttons) < len(hand):
+            # Place it within the frame that holds cards, set it to run a function when clicked
+            button_to_add = tkinter.Button(self.frame)
+            button_to_add.configure(command = lambda b=button_to_add: pressCardButton(b))
+            # The b=button_to_add makes each lambda keep its own button
+            button_to_add.card = None
+            self.buttons.append(button_to_add)
+
+        self.shown = self.buttons[:len(hand)]
+        for b, card in zip(self.shown, hand):
+            if b.card is not card:
+                # Display the card's name and energy cost
+                b.configure(text = card.fullname + " (" + str(card.cost) + ")")
+                b.card = card
+            b.pack()
+
+    def hide(self, button):
+        # Takes one button (a played card) off screen
+        button.pack_forget()
+        self.shown.remove(button)
+
+    def clear(self):
+        for b in self.shown:
+            b.pack_forget()
+        self.shown = []
+
+class WorkerJob:
+    # One function call handed to a BackgroundWorker. The function gets the
+    # job as its first argument, so it can check cancelled() every so
+    # often and report() how far along it is.
+    def __init__(self, worker, function, args, on_done, on_progress, on_error):
+        self.worker = worker
+        self.function = function
+        self.args = args
+        self.on_done = on_done # Called with the result, on the Tk thread
+        self.on_progress = on_progress # Called with whatever report() got, on the Tk thread
+        self.on_error = on_error # Called with the exception if the function raised, on the Tk thread
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        # The result (if it ever comes) is thrown away. A function that's
+        # already running finishes sooner if it checks cancelled().
+        self._cancelled.set()
+
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def report(self, *progress):
+        # For the function to call from the worker thread
+        self.worker.results.put((self, "progress", progress))
+
+class BackgroundWorker:
+    # Runs slow things (like the opponent deciding what to play) on a thread
+    # of its own, so the window never freezes while they run. Tk must only
+    # be touched from its own thread, so the worker never calls back
+    # directly: everything goes through the results queue, which poll()
+    # empties from an after() callback while any job is still out.
+    def __init__(self, window, poll_interval=20):
+        self.window = window
+        self.poll_interval = poll_interval # Milliseconds
+        self.jobs = queue.Queue()
+        self.results = queue.Queue()
+        self.pending = [] # Jobs whose results haven't been handed over yet
+        self.polling = None # The after() id of the next poll
+        self.thread = None
+
+    def submit(self, function, args=(), on_done=None, on_progress=None, on_error=None):
+        # Runs function(job, *args) on the worker thread; returns the job.
+        # Without on_error, an exception is raised again on the Tk thread.
+        if self.thread is None:
+            # A daemon thread, so a job still running can't keep the program open
+            self.thread = threading.Thread(target=self.run, name="BackgroundWorker", daemon=True)
+            self.thread.start()
+        job = WorkerJob(self, function, args, on_done, on_progress, on_error)
+        self.pending.append(job)
+        self.jobs.put(job)
+        if self.polling is None:
+            self.polling = self.window.after(self.poll_interval, self.poll)
+        return job
+
+    def run(self):
+        # The worker thread: one job at a time, until shutdown()
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            if job.cancelled():
+                self.results.put((job, "cancelled", None))
+                continue
+            try:
+                self.results.put((job, "done", job.function(job, *job.args)))
+            except Exception as error:
+                self.results.put((job, "error", error))
+
+    def poll(self):
+        # On the Tk thread: hand over everything the worker has finished
+        self.polling = None
+        error = None
+        while True:
+            try:
+                job, kind, value = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                if not job.cancelled() and job.on_progress is not None:
+                    job.on_progress(*value)
+                continue
+            self.pending.remove(job)
+            if job.cancelled():
+                continue
+            if kind == "error":
+                if job.on_error is not None:
+                    job.on_error(value)
+                else:
+                    error = value
+            elif job.on_done is not None:
+                job.on_done(value)
+
+        if self.pending and self.polling is None:
+            self.polling = self.window.after(self.poll_interval, self.poll)
+        if error is not None:
+            raise error # Tk prints it like any other callback error
+
+    def cancelAll(self):
+        for job in self.pending:
+            job.cancel()
+
+    def shutdown(self):
+        # Cancels everything and lets the thread finish
+        self.cancelAll()
+        self.jobs.put(None)
+        if self.polling is not None:
+            self.window.after_cancel(self.polling)
+            self.polling = None
+
+class CanvasProgress:
+    # A line of text and a progress bar drawn on the canvas in the middle
+    # of the window, hidden when there's nothing to show.
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.text = canvas.create_text(105, 110, text="", fill="white", state="hidden")
+        self.outline = canvas.create_rectangle(30, 125, 180, 137, outline="white", state="hidden")
+        self.bar = canvas.create_rectangle(30, 125, 30, 137, fill="white", width=0, state="hidden")
+
+    def show(self, text, fraction):
+        # fraction: how much of the bar to fill, from 0 to 1
+        self.canvas.itemconfigure(self.text, text=text, state="normal")
+        self.canvas.coords(self.bar, 30, 125, 30 + 150 * max(0.0, min(1.0, fraction)), 137)
+        for item in (self.outline, self.bar):
+            self.canvas.itemconfigure(item, state="normal")
+
+    def hide(self):
+        for item in (self.text, self.outline, self.bar):
+            self.canvas.itemconfigure(item, state="hidden")
+
+def opponentPolicy(hand, user, target):
+    # Random fighting mechanism: Computer plays random cards
+    # until it runs out of energy or cards.
+    return playFirstPolicy(hand, user, target)
+
+# The opponent's policy. It runs on the worker thread with copies of both
+# players, so a slow one (ai.SearchPolicy(), say) doesn't freeze
+# the window.
+opponent_policy = opponentPolicy
+
+def decideCard(job, policy, hand, user, target):
+    # Runs on the worker thread. A policy with a job attribute (like
+    # ai.SearchPolicy) is handed the job while it decides, so it can stop
+    # when the job is cancelled and report() how far it has got.
+    if not hasattr(policy, "job"):
+        return policy(hand, user, target)
+    policy.job = job
+    try:
+        return policy(hand, user, target)
+    finally:
+        policy.job = None
+
+class GuiBattle:
+    # A battle in the window, run as a state machine. Nothing here ever
+    # waits: clicks on the card and End Turn buttons move it along, and the
+    # opponent's turn is played one card per after() callback. The rules
+    # are all in Battle, same as simulateBattle() uses.
+    #
+    # States:
+    #   PLAYER_TURN    waiting for the player to click a card or End Turn
+    #   OPPONENT_TURN  the opponent is playing; clicks are ignored
+    #   OVER           somebody won
+    PLAYER_TURN = "player turn"
+    OPPONENT_TURN = "opponent turn"
+    OVER = "over"
+
+    def __init__(self, window, player, opponent, rng):
+        self.window = window # For after()
+        self.battle = Battle(player, opponent, rng, sink=event_sink)
+        self.state = None
+        self.opponent_hand = None # The hand the opponent's policy sees, one list per turn
+        self.opponent_hand_size = 0
+        self.thinking = None # The WorkerJob deciding the opponent's next card
+
+    def start(self):
+        self.beginPlayerTurn()
+
+    def beginPlayerTurn(self):
+        self.state = self.PLAYER_TURN
+        self.battle.beginTurn()
+        card_buttons.show(self.battle.hand)
+        self.promptPlayer()
+
+    def promptPlayer(self):
+        # Tell the player what they have, or end the turn if they can't play
+        battle = self.battle
+        updateLabels()
+        if not battle.canPlay():
+            self.endPlayerTurn()
+            return
+        if event_sink.level <= events.INFO:
+            event_sink.emit(events.HandShown(list(battle.hand), battle.player.energy_current))
+
+    def cardButton(self, button):
+        if self.state != self.PLAYER_TURN:
+            return
+        # Remove the clicked card's button and play that card.
+        card_buttons.hide(button)
+        self.battle.play(self.battle.hand.index(button.card))
+        self.promptPlayer()
+
+    def endButton(self):
+        # Will ignore remaining energy and cards and let the opponent play their turn
+        if self.state == self.PLAYER_TURN:
+            self.endPlayerTurn()
+
+    def endPlayerTurn(self):
+        card_buttons.clear()
+        if self.endTurn():
+            return
+        self.state = self.OPPONENT_TURN
+        self.battle.beginTurn()
+        self.opponent_hand = list(self.battle.hand)
+        self.opponent_hand_size = len(self.opponent_hand)
+        updateLabels()
+        # Tip from Stack Overflow: Don't use sleep() in tkinter. use after() instead.
+        self.window.after(OPPONENT_CARD_DELAY, self.opponentStep)
+
+    def opponentStep(self):
+        # Asks the worker which card the opponent plays next
+        if self.state != self.OPPONENT_TURN:
+            return
+        battle = self.battle
+        if not battle.canPlay():
+            self.endOpponentTurn()
+            return
+        progress.show("Opponent is thinking...", 0.0)
+        self.thinking = worker.submit(decideCard, (opponent_policy, self.opponent_hand, battle.opponent.clone(), battle.player.clone()),
+            self.opponentDecided, self.opponentThinking, self.opponentFailed)
+
+    def opponentThinking(self, fraction):
+        # How far the opponent's policy has got deciding (if it says)
+        if self.state == self.OPPONENT_TURN:
+            progress.show("Opponent is thinking...", fraction)
+
+    def opponentFailed(self, error):
+        # The policy raised. Say so, and play the card the opponent always
+        # used to, so the battle doesn't get stuck on the opponent's turn.
+        traceback.print_exception(type(error), error, error.__traceback__)
+        self.opponentDecided(playFirstPolicy(self.opponent_hand, self.battle.opponent, self.battle.player))
+
+    def opponentDecided(self, index):
+        # Back on the Tk thread with the opponent's choice
+        self.thinking = None
+        if self.state != self.OPPONENT_TURN:
+            return
+        if index is None:
+            self.endOpponentTurn()
+            return
+        self.opponent_hand.pop(index)
+        self.battle.play(index)
+        updateLabels()
+        progress.show("Opponent played %i of %i" % (self.battle.plays_this_turn, self.opponent_hand_size), 1.0)
+        self.window.after(OPPONENT_CARD_DELAY, self.opponentStep)
+
+    def endOpponentTurn(self):
+        progress.hide()
+        if not self.endTurn():
+            self.beginPlayerTurn()
+
+    def cancel(self):
+        # Stops the battle where it is, e.g. when the window closes
+        self.state = self.OVER
+        if self.thinking is not None:
+            self.thinking.cancel()
+            self.thinking = None
+        progress.hide()
+
+    def endTurn(self):
+        # Ends whoever's turn it is; returns True if that ended the battle
+        if self.battle.endTurn() is None:
+            return False
+        self.finish()
+        return True
+
+    def finish(self):
+        self.state = self.OVER
+        progress.hide()
+        updateLabels() # The Battle has already told event_sink who won
+
+        # Just a few commands to remove some buttons once the game is over,
+        # making it clearer that play has concluded.
+        card_buttons.clear()
+        end_button.destroy()
+
+def battle():
+    # Inform the function that it should use the external/global
+    # variable when = is used.
+    global gui_battle
+
+    # Upon starting the battle, we remove the Begin button and replace it with the End Turn button.
+    end_button.pack() 
+    battle_button.destroy()
+
+    # Every battle gets its own random numbers. Starting a StreamRandom
+    # from the printed seed deals the same cards again.
+    seed = int.from_bytes(os.urandom(4), "little")
+    event_sink.emit(events.BattleStarted(seed))
+
+    # Anything still thinking about an earlier battle is no use now
+    if gui_battle is not None:
+        gui_battle.cancel()
+    worker.cancelAll()
+
+    gui_battle = GuiBattle(main, player, opponent, streams.StreamRandom(seed))
+    gui_battle.start()
+
+def closeWindow():
+    # Stop the opponent thinking before the window goes away
+    if gui_battle is not None:
+        gui_battle.cancel()
+    worker.shutdown()
+    main.destroy()
+
+
+def launch():
+    # Makes the window and runs it until it's closed.
+    global main, player, opponent, battle_button, end_button, card_buttons, progress, worker
+
+    # GUI: Use Tkinter to create a screen for the cards.
+    # Create persistent player and opponent...
+    player = Player()
+    opponent = Player()
+
+
+    # ...then start the tkinter boilerplate.
+    main = tkinter.Tk()
+    main.geometry("500x600")
+
+    # MAKE ALL NEEDED WIDGETS
+    # A frame to hold the card buttons
+    frame_cards = tkinter.Frame(main)
+    card_buttons = CardButtonPool(frame_cards)
+
+    # A frame to hold the canvas, start button, and end turn button
+    frame_middle = tkinter.Frame(main)
+
+    # Canvas for weird art
+    canv = tkinter.Canvas(frame_middle, bd=20, width=170, height=145, bg="blue")
+    canv.create_oval(25, 35, 70, 75, fill="red")
+    progress = CanvasProgress(canv)
+    worker = BackgroundWorker(main)
+    main.protocol("WM_DELETE_WINDOW", closeWindow)
+    #canv.create_text()
+
+
+
+    # Button creation
+    #play_button = tkinter.Button(main, command=singleCardTestGlobal, fg="#FFAABB", bg="gray", activebackground="white", activeforeground="orange", cursor="dot", text="FIGHT!!!!!")
+    battle_button = tkinter.Button(frame_middle, command=battle, fg="#FFAABB", bg="gray", activebackground="white", activeforeground="orange", cursor="dot", text="Begin!")
+    end_button = tkinter.Button(frame_middle, command=pressEndButton, fg="#FFAABB", bg="black", activebackground="gray", activeforeground="red", cursor="dot", text="End Turn")
+
+
+    # LABELS FOR STATS
+    frame_left = tkinter.Frame(main)
+    frame_right = tkinter.Frame(main)
+
+    # Fonts
+    bold = tkinter.font.Font(size=14, weight="bold")
+    bold_small = tkinter.font.Font(size=11, weight="bold")
+    font12 = tkinter.font.Font(size=12)
+
+    # Create player labels
+    player_header = tkinter.Label(frame_left, text = "YOUR STATS", font = bold)
+    player_health = tkinter.Label(frame_left, text = "Health: " + str(player.health), font = font12)
+    player_energy = tkinter.Label(frame_left, text = "Energy: " + str(player.energy_current) + "/" + str(player.energy), font = font12)
+    player_defense = tkinter.Label(frame_left, text = "Defense: " + str(player.defense), font = font12)
+    player_deck = tkinter.Label(frame_left, text = "Deck Size: " + str(player.deck), font = font12)
+    player_buff_damage = tkinter.Label(frame_left, text = "Damage Buff: " + str(player.buff_damage), font = font12)
+    player_buff_defense = tkinter.Label(frame_left, text = "Defense Buff: " + str(player.buff_defense), font = font12)
+    player_buff_healing = tkinter.Label(frame_left, text = "Healing Buff: " + str(player.buff_healing), font = font12)
+
+    # Create opponent labels
+    opponent_header = tkinter.Label(frame_right, text = "OPPONENT STATS", font = bold)
+    opponent_health = tkinter.Label(frame_right, text = "Health: " + str(opponent.health), font = font12)
+    opponent_energy = tkinter.Label(frame_right, text = "Energy: " + str(opponent.energy_current) + "/" + str(opponent.energy), font = font12)
+    opponent_defense = tkinter.Label(frame_right, text = "Defense: " + str(opponent.defense), font = font12)
+    opponent_deck = tkinter.Label(frame_right, text = "Deck Size: " + str(opponent.deck), font = font12)
+    opponent_buff_damage = tkinter.Label(frame_right, text = "Damage Buff: " + str(opponent.buff_damage), font = font12)
+    opponent_buff_defense = tkinter.Label(frame_right, text = "Defense Buff: " + str(opponent.buff_defense), font = font12)
+    opponent_buff_healing = tkinter.Label(frame_right, text = "Healing Buff: " + str(opponent.buff_healing), font = font12)
+
+    # Tie every stat label to the numbers it shows, so updateLabels() knows
+    # which ones need redrawing
+    for side, labels in (
+        (player, (player_health, player_energy, player_defense, player_deck, player_buff_damage, player_buff_defense, player_buff_healing)),
+        (opponent, (opponent_health, opponent_energy, opponent_defense, opponent_deck, opponent_buff_damage, opponent_buff_defense, opponent_buff_healing)),
+    ):
+        for label, (fields, text) in zip(labels, STAT_LABELS):
+            label_bindings.append(LabelBinding(label, side, fields, text))
+
+    # FINISH UP RENDERING
+    # Won't show up unless you pack it.
+    # Or, grid() or place() may also work.
+    #play_button.pack(expand=True)
+    #play_button_text.pack()
+
+    frame_cards.pack(side = tkinter.TOP)
+    frame_middle.pack(side = tkinter.TOP)
+    canv.pack()
+    #play_button.pack()
+    battle_button.pack()
+    #end_button.pack()
+
+    #player_stats.pack()
+
+
+    frame_left.pack(side = tkinter.LEFT)
+    frame_right.pack(side = tkinter.RIGHT)
+
+
+    player_header.pack()
+    player_health.pack()
+    player_energy.pack()
+    player_defense.pack()
+    player_deck.pack()
+    player_buff_damage.pack()
+    player_buff_defense.pack()
+    player_buff_healing.pack()
+
+    opponent_header.pack()
+    opponent_health.pack()
+    opponent_energy.pack()
+    opponent_defense.pack()
+    opponent_deck.pack()
+    opponent_buff_damage.pack()
+    opponent_buff_defense.pack()
+    opponent_buff_healing.pack()
+
+
+    # TEST: Update a label
+    #player_buff_healing.configure(text = "Oh no")
+    # Success!
+
+    # Make tkinter do its thing
+    main.mainloop()
+
+
+if __name__ == "__main__":
+    launch()
@@ -0,0 +1,171 @@
+# Load test for the match server: opens thousands of local sessions, plays
+# a whole battle on each (every card it can, then end turn), and reports
+# how long the server took to answer each move.
+#
+# Latency is timed from sending a request to reading its reply. Sessions
+# per core is battles finished divided by the CPU time the server spent
+# on them, from its "stats" before and after, so it doesn't depend on how
+# busy the client kept it.
+#
+# With no --port or --unix, a server is started for the run on a
+# temporary Unix socket and stopped afterwards:
+#     python -m randomcards.loadtest --sessions 5000 --concurrency 2000
+#     python -m randomcards.loadtest --port 7777     # an already running server
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+# The directory holding the randomcards package, for starting a server
+PACKAGE_PARENT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(ordered, fraction):
+    # The value fraction of the way up an already sorted list
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+class LoadTest:
+    def __init__(self, host="127.0.0.1", port=None, unix_path=None):
+        self.host = host
+        self.port = port
+        self.unix_path = unix_path
+        self.latencies = [] # Seconds, one per request
+        self.errors = 0 # Replies with "ok": false, and sessions that broke off
+        self.sessions_done = 0
+
+    async def connect(self):
+        if self.unix_path is not None:
+            return await asyncio.open_unix_connection(self.unix_path)
+        return await asyncio.open_connection(self.host, self.port)
+
+    async def request(self, reader, writer, request):
+        start = time.perf_counter()
+        writer.write(json.dumps(request).encode("utf-8") + b"\n")
+        line = await reader.readline()
+        self.latencies.append(time.perf_counter() - start)
+        if not line:
+            raise ConnectionError("the server closed the connection")
+        reply = json.loads(line)
+        if not reply["ok"]:
+            self.errors += 1
+        return reply
+
+    async def stats(self):
+        reader, writer = await self.connect()
+        reply = await self.request(reader, writer, {"op": "stats"})
+        writer.close()
+        return reply
+
+    async def playSession(self, seed, opened):
+        # One connection, one whole battle. opened limits how many
+        # sessions are connected at once.
+        async with opened:
+            try:
+                reader, writer = await self.connect()
+            except OSError:
+                self.errors += 1
+                return
+            try:
+                state = await self.request(reader, writer, {"op": "start", "seed": seed})
+                while state["ok"] and not state["over"]:
+                    if state["can_play"]:
+                        state = await self.request(reader, writer, {"op": "play", "card": 0})
+                    else:
+                        state = await self.request(reader, writer, {"op": "end"})
+                self.sessions_done += 1
+            except (OSError, ValueError):
+                self.errors += 1
+            finally:
+                writer.close()
+
+    async def run(self, sessions, concurrency, seed=0):
+        # Returns a dict of results for sessions battles, at most
+        # concurrency of them connected at once.
+        before = await self.stats()
+        opened = asyncio.Semaphore(concurrency)
+        start = time.perf_counter()
+        await asyncio.gather(*(self.playSession(seed + index, opened) for index in range(sessions)))
+        elapsed = time.perf_counter() - start
+        after = await self.stats()
+
+        ordered = sorted(self.latencies)
+        cpu = after["cpu_seconds"] - before["cpu_seconds"]
+        finished = after["battles_finished"] - before["battles_finished"]
+        return {
+            "sessions": self.sessions_done,
+            "concurrency": concurrency,
+            "errors": self.errors,
+            "moves": len(ordered),
+            "seconds": elapsed,
+            "moves_per_second": len(ordered) / elapsed if elapsed else 0.0,
+            "p50_ms": percentile(ordered, 0.50) * 1000,
+            "p99_ms": percentile(ordered, 0.99) * 1000,
+            "server_cpu_seconds": cpu,
+            "sessions_per_core_second": finished / cpu if cpu else 0.0,
+        }
+
+
+def startServer(unix_path, max_sessions):
+    # A server in its own process, so its CPU time is its own
+    server = subprocess.Popen(
+        [sys.executable, "-m", "randomcards.server", "--unix", unix_path, "--max-sessions", str(max_sessions)],
+        cwd=PACKAGE_PARENT, stdout=subprocess.DEVNULL)
+    deadline = time.monotonic() + 10
+    while not os.path.exists(unix_path):
+        if server.poll() is not None or time.monotonic() > deadline:
+            server.kill()
+            raise RuntimeError("the match server didn't start")
+        time.sleep(0.02)
+    return server
+
+def formatResults(results):
+    return "\n".join((
+        "Sessions: %i (%i at once), %i errors" % (results["sessions"], results["concurrency"], results["errors"]),
+        "Moves: %i in %.2f s (%.0f per second)" % (results["moves"], results["seconds"], results["moves_per_second"]),
+        "Move latency: p50 %.2f ms, p99 %.2f ms" % (results["p50_ms"], results["p99_ms"]),
+        "Server CPU: %.2f s, %.0f sessions per core-second" % (results["server_cpu_seconds"], results["sessions_per_core_second"]),
+    ))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play many battles against a match server at once and report move latency.")
+    parser.add_argument("--sessions", type=int, default=2000, help="battles to play, one connection each")
+    parser.add_argument("--concurrency", type=int, default=1000, help="sessions connected at the same time")
+    parser.add_argument("--seed", type=int, default=0, help="session i uses battle seed seed+i")
+    parser.add_argument("--host", default="127.0.0.1", help="server address, with --port")
+    parser.add_argument("--port", type=int, help="test the server on this TCP port")
+    parser.add_argument("--unix", help="test the server on this Unix socket")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args(argv)
+
+    server = None
+    unix_path = args.unix
+    if args.port is None and unix_path is None:
+        directory = tempfile.mkdtemp()
+        unix_path = os.path.join(directory, "server.sock")
+        # Room for closed sessions the server hasn't noticed yet, and stats
+        server = startServer(unix_path, 2 * args.concurrency + 1)
+    try:
+        test = LoadTest(args.host, args.port, unix_path)
+        results = asyncio.run(test.run(args.sessions, args.concurrency, args.seed))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+            shutil.rmtree(directory, ignore_errors=True)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(formatResults(results))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
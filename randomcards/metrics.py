@@ -0,0 +1,148 @@
+# Optional counters and timers for the battle loop.
+#
+# While metrics are on, every card a Battle plays goes through
+# Metrics.playCard(), which counts how often each effect fires and how
+# much it actually applied (after buffs), and simulateBattle() times the
+# phases of every turn:
+#     hand_generation  beginTurn(): reset defense, add energy, draw the hand
+#     player_phase     the player's policy choosing and playing cards
+#     opponent_phase   the same for the opponent
+#     end_checks       endTurn(): has anybody won?
+# The GUI's battles count their cards too, but aren't timed: GuiBattle
+# runs the turns itself, without simulateBattle().
+#
+# Cards played by the AI's search and the planner while they think aren't
+# counted, only the ones that really get played.
+#
+#     metrics = metrics.enableMetrics()
+#     ... run battles ...
+#     metrics.disableMetrics()
+#     print(metrics.toPrometheus())
+#
+# Metrics are per process. For a tournament, tournament.py collects
+# them in every worker and adds them up (--metrics).
+
+import json
+import time
+from contextlib import contextmanager
+
+from randomcards import core, engine
+
+PHASES = ("hand_generation", "player_phase", "opponent_phase", "end_checks")
+WINNERS = ("player", "opponent", None)
+
+
+class Metrics:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        # Indexed by effect code, like core.EFFECT_NAMES
+        self.effect_fired = [0] * len(core.EFFECT_NAMES)
+        self.effect_power = [0] * len(core.EFFECT_NAMES)
+        self.cards_played = 0
+        self.phase_seconds = dict.fromkeys(PHASES, 0.0)
+        self.phase_count = dict.fromkeys(PHASES, 0)
+        self.battles = dict.fromkeys(WINNERS, 0) # winner -> battles
+
+    def playCard(self, card, user, target):
+        # Does the same as card.play(user, target), counting as it goes
+        effect_functions = core.EFFECT_FUNCTIONS
+        fired = self.effect_fired
+        applied = self.effect_power
+        for code, power in card.ops:
+            fired[code] += 1
+            applied[code] += effect_functions[code](power, user, target)
+        self.cards_played += 1
+
+    def lap(self, phase, start):
+        # Adds the time since start to phase and returns the time now,
+        # which is where the next phase starts
+        now = time.perf_counter()
+        self.phase_seconds[phase] += now - start
+        self.phase_count[phase] += 1
+        return now
+
+    def battleOver(self, battle):
+        self.battles[battle.winner] += 1
+
+    def merge(self, other):
+        # Adds another Metrics' numbers into this one
+        for code in range(len(self.effect_fired)):
+            self.effect_fired[code] += other.effect_fired[code]
+            self.effect_power[code] += other.effect_power[code]
+        self.cards_played += other.cards_played
+        for phase in PHASES:
+            self.phase_seconds[phase] += other.phase_seconds[phase]
+            self.phase_count[phase] += other.phase_count[phase]
+        for winner in WINNERS:
+            self.battles[winner] += other.battles[winner]
+        return self
+
+    def asDict(self):
+        return {
+            "battles": sum(self.battles.values()),
+            "winners": {str(winner).lower(): self.battles[winner] for winner in WINNERS},
+            "cards_played": self.cards_played,
+            "effects": {
+                name: {"fired": self.effect_fired[code], "power": self.effect_power[code]}
+                for code, name in enumerate(core.EFFECT_NAMES) if code > 0
+            },
+            "phases": {
+                phase: {"seconds": self.phase_seconds[phase], "count": self.phase_count[phase]}
+                for phase in PHASES
+            },
+        }
+
+    def toJSON(self, indent=2):
+        return json.dumps(self.asDict(), indent=indent)
+
+    def toPrometheus(self, prefix="randomcards"):
+        # The Prometheus text exposition format, ready to be served or
+        # written to a node_exporter textfile
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append("# HELP %s_%s %s" % (prefix, name, help_text))
+            lines.append("# TYPE %s_%s %s" % (prefix, name, kind))
+            for labels, value in samples:
+                lines.append("%s_%s%s %s" % (prefix, name, "{%s}" % labels if labels else "", value))
+
+        effects = [(code, name) for code, name in enumerate(core.EFFECT_NAMES) if code > 0]
+        metric("battles_total", "counter", "Battles finished, by winner.",
+            [('winner="%s"' % str(winner).lower(), self.battles[winner]) for winner in WINNERS])
+        metric("cards_played_total", "counter", "Cards played in battles.", [("", self.cards_played)])
+        metric("effect_fired_total", "counter", "Times each card effect was applied.",
+            [('effect="%s"' % name, self.effect_fired[code]) for code, name in effects])
+        metric("effect_power_total", "counter", "Total amount each card effect applied, after buffs.",
+            [('effect="%s"' % name, self.effect_power[code]) for code, name in effects])
+        metric("phase_seconds_total", "counter", "Time spent in each phase of a turn.",
+            [('phase="%s"' % phase, repr(self.phase_seconds[phase])) for phase in PHASES])
+        metric("phase_total", "counter", "Times each phase of a turn ran.",
+            [('phase="%s"' % phase, self.phase_count[phase]) for phase in PHASES])
+        return "\n".join(lines) + "\n"
+
+
+def enableMetrics(metrics=None):
+    # Starts collecting into metrics (a new Metrics by default) and returns it
+    if metrics is None:
+        metrics = Metrics()
+    engine.metrics = metrics
+    return metrics
+
+def disableMetrics():
+    # Stops collecting and returns whatever was collecting, or None
+    metrics = engine.metrics
+    engine.metrics = None
+    return metrics
+
+@contextmanager
+def collectingMetrics(metrics=None):
+    #     with metrics.collectingMetrics() as metrics:
+    #         engine.simulateBattle(...)
+    previous = engine.metrics
+    metrics = enableMetrics(metrics)
+    try:
+        yield metrics
+    finally:
+        engine.metrics = previous
@@ -0,0 +1,173 @@
+# Works out the best way to play a hand: which cards, and in what order.
+#
+# Trying every order of every subset of the hand gets out of control fast
+# (a 10-card hand from Boost Deck has almost 10 million). This uses dynamic
+# programming over the set of cards played so far instead:
+#
+# - Buffs, debuffs and energy costs just add up, so after playing a set of
+#   cards they come out the same whatever the order was. That means whether
+#   the turn can go on (energy_current > 0) only depends on the set.
+# - What the order does change is how much the buffs added to the effects
+#   played after them. So for each set of cards there can be a few
+#   different end results; all of them are kept, and identical ones merged.
+# - With a monotone score (more of your own health/defense/energy/deck is
+#   better, less of the target's is better), a result that is no better
+#   than another one for the same set in any of those numbers is dropped.
+#
+# planHand() gives the best order for a scoring function, suggestPlay()
+# turns it into a hint, and PlannerPolicy plays it as a bot.
+
+from randomcards import ai, core
+
+# Where these numbers are in a Player.snapshot()
+_HEALTH = core.PLAYER_FIELDS.index("health")
+_ENERGY = core.PLAYER_FIELDS.index("energy")
+_DEFENSE = core.PLAYER_FIELDS.index("defense")
+_DECK = core.PLAYER_FIELDS.index("deck")
+_ENERGY_CURRENT = core.PLAYER_FIELDS.index("energy_current")
+_ACCUMULATED = (_HEALTH, _ENERGY, _DEFENSE, _DECK)
+_ADDITIVE = tuple(i for i in range(len(core.PLAYER_FIELDS)) if i not in _ACCUMULATED)
+
+def endOfTurnScore(user, target):
+    # The default score: beating the target wins outright, otherwise
+    # the same static evaluation the search opponent uses.
+    if target.isDefeated():
+        return ai.WIN
+    return ai.evaluate(user, target)
+
+
+class Plan:
+    # order: indices into the hand, in the order to play them (may be empty)
+    # value: the score after playing them
+    # user, target: snapshots of both players afterwards
+    def __init__(self, order, value, user, target):
+        self.order = order
+        self.value = value
+        self.user = user
+        self.target = target
+
+    def cards(self, hand):
+        return [hand[i] for i in self.order]
+
+
+def planHand(hand, user, target, score=endOfTurnScore, first_play=True, monotone=True):
+    # Returns the best Plan for user to play from hand against target.
+    # first_play: True at the start of a turn, when the first card can be
+    # played even in energy debt; False if cards were already played.
+    # monotone: set to False if score isn't monotone (see above) to keep
+    # every distinct result instead of pruning.
+    # user and target aren't changed.
+    n = len(hand)
+    ids = [ai.cardKey(card) for card in hand]
+    scratch_user = user.clone()
+    scratch_target = target.clone()
+
+    def value(node):
+        scratch_user.restore(node[0])
+        scratch_target.restore(node[1])
+        return score(scratch_user, scratch_target)
+
+    start = (user.snapshot(), target.snapshot(), ())
+    best = start
+    best_value = value(start)
+
+    # layer[mask] holds the distinct results of playing the cards in mask
+    layer = {0: [start]}
+    for size in range(n):
+        next_layer = {}
+        for mask, nodes in layer.items():
+            # Energy is the same for every order of the same cards
+            if (size > 0 or not first_play) and nodes[0][0][_ENERGY_CURRENT] <= 0:
+                continue
+
+            for i in range(n):
+                if mask >> i & 1 or not firstCopy(ids, mask, i):
+                    continue
+                card = hand[i]
+                results = next_layer.setdefault(mask | 1 << i, {})
+                for user_state, target_state, order in nodes:
+                    scratch_user.restore(user_state)
+                    scratch_target.restore(target_state)
+                    card.play(scratch_user, scratch_target)
+                    scratch_user.energy_current -= card.cost
+                    result = (scratch_user.snapshot(), scratch_target.snapshot())
+                    if result not in results:
+                        results[result] = order + (i,)
+
+        layer = {}
+        for mask, results in next_layer.items():
+            nodes = [(user_state, target_state, order) for (user_state, target_state), order in results.items()]
+            if monotone and len(nodes) > 1:
+                nodes = undominated(nodes)
+            layer[mask] = nodes
+            for node in nodes:
+                node_value = value(node)
+                if node_value > best_value:
+                    best = node
+                    best_value = node_value
+        if not layer:
+            break
+
+    return Plan(list(best[2]), best_value, best[0], best[1])
+
+def undominated(nodes):
+    # Drops results that are no better than another one in every number
+    # the order can change. Results are only compared with others whose
+    # buffs, energy and so on match exactly.
+    groups = {}
+    for node in nodes:
+        key = (tuple(node[0][i] for i in _ADDITIVE), tuple(node[1][i] for i in _ADDITIVE))
+        groups.setdefault(key, []).append(node)
+
+    kept = []
+    for group in groups.values():
+        # Each result as numbers where bigger is better for the user
+        points = [(tuple(node[0][i] for i in _ACCUMULATED) + tuple(-node[1][i] for i in _ACCUMULATED), node) for node in group]
+        for point, node in points:
+            dominated = False
+            for other, other_node in points:
+                if other_node is not node and other != point and all(a >= b for a, b in zip(other, point)):
+                    dominated = True
+                    break
+            if not dominated:
+                kept.append(node)
+    return kept
+
+def firstCopy(ids, mask, i):
+    # With two copies of the same card in hand, only ever play the first
+    # unplayed one, so the same set isn't reached twice.
+    for j in range(i):
+        if ids[j] == ids[i] and not mask >> j & 1:
+            return False
+    return True
+
+def suggestPlay(hand, user, target, score=endOfTurnScore):
+    # A hint for a human player, like "Play: Sharp Sword of Doom, then ..."
+    plan = planHand(hand, user, target, score)
+    if not plan.order:
+        return "End your turn."
+    return "Play: " + ", then ".join(str(card) for card in plan.cards(hand))
+
+
+class PlannerPolicy:
+    # A bot that plans its whole hand at the start of each turn and then
+    # plays the plan card by card (see policies in engine.py).
+    def __init__(self, score=endOfTurnScore, monotone=True):
+        self.score = score
+        self.monotone = monotone
+        self.hand = None
+        self.planned = []
+
+    def __call__(self, hand, user, target):
+        if hand is not self.hand:
+            self.hand = hand
+            self.planned = planHand(hand, user, target, self.score, True, self.monotone).cards(hand)
+
+        if not self.planned:
+            return None
+        # The battle takes played cards out of the hand, so find it again
+        card = self.planned.pop(0)
+        for i, in_hand in enumerate(hand):
+            if in_hand is card:
+                return i
+        return None
@@ -0,0 +1,263 @@
+# A match server: many battles against the computer at once, from one
+# process, over a local TCP or Unix socket.
+#
+# Every connection plays one battle at a time, with its own two Players,
+# its own random numbers (a streams.StreamRandom, so a battle's seed
+# deals the same cards again in the GUI) and its own turn state. The
+# rules are engine.Battle's, same as everywhere else.
+#
+# The protocol is JSON lines: one request object per line, and exactly
+# one reply line per request, in order.
+#     {"op": "start"}               new battle (or {"op": "start", "seed": 5})
+#     {"op": "play", "card": 0}     play the card at that index of your hand
+#     {"op": "end"}                 end your turn; the opponent plays theirs
+#     {"op": "stats"}               server counters (the load test uses these)
+# Replies have "ok": true and the battle's state (see MatchSession.state()),
+# or "ok": false and an "error" message. Bad requests don't close the
+# connection; lines that are too long, and idle connections, do.
+#
+# Memory per connection is capped: a request line can be at most
+# max_line bytes, the reader stops taking data from the socket once two
+# lines' worth are waiting, and the server doesn't read the next request
+# until the last reply has gone out (or fits under max_output bytes of
+# buffer). A client that sends faster than it reads just gets slowed down.
+#
+# From the command line:
+#     python -m randomcards serve --port 7777
+#     python -m randomcards serve --unix /tmp/randomcards.sock
+# and see loadtest.py for a client that hammers it.
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+from randomcards import streams
+from randomcards.core import PLAYER_FIELDS, Player
+from randomcards.engine import Battle, playFirstPolicy
+
+MAX_LINE = 4096 # Bytes in one request line
+MAX_OUTPUT = 64 * 1024 # Bytes of replies to buffer before waiting on the client
+IDLE_TIMEOUT = 300.0 # Seconds before a silent connection is closed
+
+OPS = ("start", "play", "end", "stats")
+
+
+class MatchSession:
+    # One battle on one connection. The player is told their hand, plays
+    # cards from it, and ends their turn; the opponent's whole turn is
+    # then played straight away by opponent_policy.
+    def __init__(self, seed, opponent_policy=playFirstPolicy, max_rounds=1000):
+        self.seed = seed
+        self.battle = Battle(Player(), Player(), streams.StreamRandom(seed))
+        self.opponent_policy = opponent_policy
+        self.max_rounds = max_rounds
+        self.over = False
+        self.opponent_played = [] # Names of the cards of the opponent's last turn
+        self.dealHand()
+
+    def dealHand(self):
+        # Starts the player's turn. The hand is described once here and
+        # kept up to date by play(), rather than rebuilt for every reply.
+        self.battle.beginTurn()
+        self.hand_view = [[card.fullname, card.cost] for card in self.battle.hand]
+
+    def play(self, index):
+        # Plays the card at index of the player's hand
+        battle = self.battle
+        if self.over:
+            raise ValueError("the battle is over")
+        if not battle.canPlay():
+            raise ValueError("no more cards can be played this turn")
+        if type(index) is not int or not 0 <= index < len(battle.hand):
+            raise ValueError("no card %r in a hand of %i" % (index, len(battle.hand)))
+        self.hand_view.pop(index)
+        return battle.play(index)
+
+    def endTurn(self):
+        # Ends the player's turn, plays the opponent's, and deals the
+        # player's next hand unless the battle is over.
+        battle = self.battle
+        if self.over:
+            raise ValueError("the battle is over")
+        battle.endTurn()
+
+        self.opponent_played = []
+        if battle.winner is None:
+            battle.beginTurn()
+            user, target = battle.sides()
+            while battle.canPlay():
+                index = self.opponent_policy(battle.hand, user, target)
+                if index is None:
+                    break
+                self.opponent_played.append(battle.play(index).fullname)
+            battle.endTurn()
+
+        if battle.winner is not None or (self.max_rounds is not None and battle.round >= self.max_rounds):
+            self.over = True # A battle stopped at max_rounds has no winner
+            self.hand_view = []
+        else:
+            self.dealHand()
+
+    def state(self):
+        # What the player gets to see, as a dict ready for JSON
+        battle = self.battle
+        return {
+            "seed": self.seed,
+            "round": battle.round,
+            "hand": self.hand_view,
+            "can_play": not self.over and battle.canPlay(),
+            "player": dict(zip(PLAYER_FIELDS, battle.player.snapshot())),
+            "opponent": dict(zip(PLAYER_FIELDS, battle.opponent.snapshot())),
+            "opponent_played": self.opponent_played,
+            "over": self.over,
+            "winner": battle.winner,
+        }
+
+
+class MatchServer:
+    # Hosts a MatchSession per connection. start() listens on a TCP port
+    # or a Unix socket; run() is start() plus serving until cancelled.
+    def __init__(self, max_sessions=10000, opponent_policy=playFirstPolicy, max_rounds=1000,
+            max_line=MAX_LINE, max_output=MAX_OUTPUT, idle_timeout=IDLE_TIMEOUT):
+        self.max_sessions = max_sessions
+        self.opponent_policy = opponent_policy
+        self.max_rounds = max_rounds
+        self.max_line = max_line
+        self.max_output = max_output
+        self.idle_timeout = idle_timeout
+
+        self.connections = 0 # Open right now
+        self.battles_started = 0
+        self.battles_finished = 0
+        self.moves = 0 # Requests answered, of any kind
+        self.server = None # The asyncio server once started
+
+    async def start(self, host="127.0.0.1", port=7777, unix_path=None):
+        # A backlog big enough for every session connecting at once (the
+        # OS may still cap it lower)
+        if unix_path is not None:
+            self.server = await asyncio.start_unix_server(self.serveConnection, unix_path, limit=self.max_line, backlog=self.max_sessions)
+        else:
+            self.server = await asyncio.start_server(self.serveConnection, host, port, limit=self.max_line, backlog=self.max_sessions)
+        return self.server
+
+    async def run(self, host="127.0.0.1", port=7777, unix_path=None):
+        server = await self.start(host, port, unix_path)
+        async with server:
+            await server.serve_forever()
+
+    def stats(self):
+        return {
+            "connections": self.connections,
+            "battles_started": self.battles_started,
+            "battles_finished": self.battles_finished,
+            "moves": self.moves,
+            "cpu_seconds": time.process_time(),
+        }
+
+    def newSession(self, seed):
+        if seed is None:
+            seed = int.from_bytes(os.urandom(4), "little")
+        elif type(seed) is not int:
+            raise ValueError("seed has to be an int")
+        self.battles_started += 1
+        return MatchSession(seed, self.opponent_policy, self.max_rounds)
+
+    def handle(self, session, request):
+        # Answers one request. Returns (session, reply), since "start"
+        # replaces the connection's session.
+        if not isinstance(request, dict):
+            raise ValueError("requests have to be JSON objects")
+        op = request.get("op")
+        if op not in OPS:
+            raise ValueError("unknown op %r" % (op,))
+        if op == "stats":
+            return session, dict(self.stats(), ok=True)
+        if op == "start":
+            session = self.newSession(request.get("seed"))
+        elif session is None:
+            raise ValueError("no battle yet; send {\"op\": \"start\"}")
+        elif op == "play":
+            session.play(request.get("card"))
+        else:
+            session.endTurn()
+            if session.over:
+                self.battles_finished += 1
+        return session, dict(session.state(), ok=True)
+
+    async def serveConnection(self, reader, writer):
+        if self.connections >= self.max_sessions:
+            writer.write(b'{"ok":false,"error":"server full"}\n')
+            await self.close(writer)
+            return
+        self.connections += 1
+        writer.transport.set_write_buffer_limits(high=self.max_output)
+
+        # Closing the transport when the timer runs out ends the readline()
+        # below. One timer handle per request is much cheaper than a
+        # wait_for(), which starts a task each time.
+        loop = asyncio.get_running_loop()
+        idle_timer = loop.call_later(self.idle_timeout, writer.transport.close)
+        session = None
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # Longer than max_line; the rest of it can't be trusted
+                    writer.write(b'{"ok":false,"error":"request too long"}\n')
+                    break
+                if not line:
+                    break # The client hung up, or went quiet for too long
+                idle_timer.cancel()
+                idle_timer = loop.call_later(self.idle_timeout, writer.transport.close)
+
+                try:
+                    session, reply = self.handle(session, json.loads(line))
+                except (ValueError, RecursionError) as error:
+                    # json's errors are ValueErrors too, and a short line
+                    # of deeply nested brackets is a RecursionError
+                    reply = {"ok": False, "error": str(error)}
+                self.moves += 1
+                writer.write(json.dumps(reply, separators=(",", ":")).encode("utf-8") + b"\n")
+                # Backpressure: nothing more is read until the client has
+                # taken enough of the replies
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            idle_timer.cancel()
+            self.connections -= 1
+            await self.close(writer)
+
+    async def close(self, writer):
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Host many battles against the computer over a JSON-lines socket.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=7777, help="TCP port to listen on")
+    parser.add_argument("--unix", help="listen on this Unix socket instead of TCP")
+    parser.add_argument("--max-sessions", type=int, default=10000, help="connections allowed at once")
+    parser.add_argument("--max-rounds", type=int, default=1000, help="stop a battle after this many rounds")
+    parser.add_argument("--idle-timeout", type=float, default=IDLE_TIMEOUT, help="seconds before a silent connection is closed")
+    args = parser.parse_args(argv)
+
+    server = MatchServer(args.max_sessions, max_rounds=args.max_rounds, idle_timeout=args.idle_timeout)
+    print("Serving on " + (args.unix or "%s:%i" % (args.host, args.port)), flush=True)
+    try:
+        asyncio.run(server.run(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+# Random number streams that can be split up and replayed exactly.
+#
+# A StreamRandom is a random.Random (so it works anywhere the rest of the
+# code takes an rng) whose numbers come from hashing a counter with a key:
+# word i of the stream is part of blake2b(block number, key=key). That
+# has two handy consequences:
+#
+# - Its whole state is the key and how far along the stream it is, so it
+#   can be saved in a few bytes (a Mersenne Twister needs 2.5 KB), and
+#   jumping to any point is free.
+# - Child streams are made by hashing the parent's key with a label
+#   (spawn()). Different labels give unrelated keys, so the children are
+#   independent of each other and of the parent, however many there are
+#   and whichever process makes them. That's what the tournament uses for
+#   one stream per battle:
+#
+#     rng = streamRandom(seed, "battle", index)
+#
+# gives battle number index of any run with that seed, on any machine,
+# with any number of workers.
+#
+# Besides the usual random.Random methods there is randbelowMany(), which
+# draws lots of row numbers in one go (see CardBatchMakerRandom()).
+
+import hashlib
+import os
+import random
+import struct
+import sys
+from array import array
+
+# Bump this if the numbers a seed gives ever change, so saved results
+# that depend on them (balance.py's studies) know to start over.
+STREAM_VERSION = 1
+
+_BLOCK = struct.Struct("<8Q") # One hash is 8 64-bit words
+_MASK = (1 << 64) - 1
+_PERSON = b"RandomCards"
+
+
+def streamKey(seed, *labels):
+    # The 32 byte key for seed (an int, str or bytes) followed by labels
+    key = hashlib.blake2b(_seedBytes(seed), digest_size=32, person=_PERSON).digest()
+    for label in labels:
+        key = hashlib.blake2b(_seedBytes(label), digest_size=32, key=key, person=_PERSON).digest()
+    return key
+
+def _seedBytes(value):
+    # Types are tagged so 1, "1" and b"1" are all different seeds
+    if isinstance(value, bytes):
+        return b"b" + value
+    if isinstance(value, str):
+        return b"s" + value.encode("utf-8")
+    if isinstance(value, int):
+        return b"i" + str(value).encode("ascii")
+    raise TypeError("seeds and labels have to be int, str or bytes, not %s" % type(value).__name__)
+
+def streamRandom(seed, *labels):
+    # The StreamRandom for seed followed by labels; the same as
+    # StreamRandom(seed).spawn(*labels)
+    return StreamRandom(key=streamKey(seed, *labels))
+
+
+class StreamRandom(random.Random):
+    # StreamRandom(seed) starts the stream for seed (an int, str or bytes;
+    # None picks a random one). StreamRandom(key=...) starts one from a key
+    # made by streamKey().
+    def __init__(self, seed=None, key=None):
+        self.key = None
+        self._block = -1 # Which block _words came from
+        self._words = [] # What's left of that block, next word last
+        if key is None:
+            self.seed(seed)
+        else:
+            self.setKey(key)
+
+    def seed(self, a=None, version=2):
+        if a is None:
+            a = os.urandom(32)
+        self.setKey(streamKey(a))
+
+    def setKey(self, key):
+        self.key = bytes(key)
+        self.position = 0
+        self.gauss_next = None
+
+    @property
+    def position(self):
+        # How many 64-bit words of the stream have been used
+        return (self._block + 1 << 3) - len(self._words)
+
+    @position.setter
+    def position(self, position):
+        if position & 7:
+            self._fill(position >> 3)
+            del self._words[8 - (position & 7):]
+        else:
+            self._block = (position >> 3) - 1
+            self._words = []
+
+    def spawn(self, *labels):
+        # A new, independent stream labelled by labels. It only depends on
+        # this stream's key, not on how much of this stream has been used.
+        key = self.key
+        for label in labels:
+            key = hashlib.blake2b(_seedBytes(label), digest_size=32, key=key, person=_PERSON).digest()
+        return StreamRandom(key=key)
+
+    def _fill(self, block):
+        words = list(_BLOCK.unpack(hashlib.blake2b(block.to_bytes(8, "little"), digest_size=64, key=self.key).digest()))
+        words.reverse()
+        self._words = words
+        self._block = block
+
+    def nextWord(self):
+        # The next 64 random bits, as an int
+        if not self._words:
+            self._fill(self._block + 1)
+        return self._words.pop()
+
+    def random(self):
+        # 53 random bits, the most a float between 0 and 1 can have
+        return (self.nextWord() >> 11) * (1.0 / (1 << 53))
+
+    def getrandbits(self, k):
+        if k < 0:
+            raise ValueError("number of bits must be non-negative")
+        if k <= 64:
+            return self.nextWord() >> (64 - k)
+        value = 0
+        for i in range((k + 63) >> 6):
+            value = value << 64 | self.nextWord()
+        return value >> (-k & 63)
+
+    def _randbelow(self, n):
+        # A random int in range(n), from one word almost every time
+        # (Lemire's multiply-and-shift, with the rare biased results redrawn).
+        # nextWord() is written out here since this is what randrange(),
+        # and so CardMakerRandom(), spends its time in.
+        if n > 1 << 64:
+            return self._randbelow_with_getrandbits(n)
+        words = self._words
+        if not words:
+            self._fill(self._block + 1)
+            words = self._words
+        product = words.pop() * n
+        if product & _MASK < n:
+            threshold = ((1 << 64) - n) % n
+            while product & _MASK < threshold:
+                product = self.nextWord() * n
+        return product >> 64
+
+    def randomBytes(self, blocks):
+        # The next whole blocks of the stream as bytes (64 per block),
+        # starting at the first block that hasn't been touched yet
+        first = self._block + 1
+        key = self.key
+        data = b"".join(hashlib.blake2b(block.to_bytes(8, "little"), digest_size=64, key=key).digest() for block in range(first, first + blocks))
+        self.position = first + blocks << 3
+        return data
+
+    def randbelowMany(self, n, count):
+        # count random ints in range(n), as an array, for drawing lots of
+        # row numbers at once. This takes whole blocks of the stream and
+        # uses them a byte (or two) per number, throwing away the ones that
+        # would make small numbers more likely, so it doesn't give the same
+        # numbers as calling randrange() count times would.
+        if n > 65536:
+            return array("Q", [self._randbelow(n) for i in range(count)])
+        result = array("B" if n <= 256 else "H")
+        if n <= 256:
+            # Bytes below limit map to byte % n, the rest are deleted, all in C
+            limit = 256 - 256 % n
+            lookup = bytes(value % n for value in range(256))
+            rejected = bytes(range(limit, 256))
+            while len(result) < count:
+                blocks = ((count - len(result)) * 256 // limit >> 6) + 1
+                result.frombytes(self.randomBytes(blocks).translate(lookup, rejected))
+        else:
+            limit = 65536 - 65536 % n
+            while len(result) < count:
+                blocks = ((count - len(result)) * 65536 // limit >> 5) + 1
+                pairs = array("H")
+                pairs.frombytes(self.randomBytes(blocks))
+                if sys.byteorder == "big":
+                    pairs.byteswap() # The stream is little-endian
+                result.extend([pair % n for pair in pairs if pair < limit])
+        del result[count:]
+        return result
+
+    def getstate(self):
+        return (STREAM_VERSION, self.key, self.position, self.gauss_next)
+
+    def setstate(self, state):
+        version, key, position, gauss_next = state
+        if version != STREAM_VERSION:
+            raise ValueError("state is from StreamRandom version %r, this is version %r" % (version, STREAM_VERSION))
+        self.setKey(key)
+        self.position = position
+        self.gauss_next = gauss_next
@@ -0,0 +1,168 @@
+# Runs a big batch of headless battles across several processes.
+#
+# The battles are numbered 0..battles-1 and battle i always gets the same
+# random numbers for a given seed, no matter which process runs it. The
+# numbers are split into shards, every shard is run separately, and the
+# per-shard counts are added up at the end. Everything counted is an int,
+# so the totals come out exactly the same on 1 worker or 64.
+#
+# From the command line:
+#     python -m randomcards simulate --battles 100000 --seed 1 --workers 8
+#     python -m randomcards simulate --metrics prometheus --metrics-file battles.prom
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+
+from randomcards import core, engine, streams
+from randomcards.metrics import Metrics, collectingMetrics
+
+
+def battleRandom(seed, index):
+    # The random numbers for battle number index of a tournament: a stream
+    # of its own, independent of every other battle's (see streams.py),
+    # and the same on every machine.
+    return streams.streamRandom(seed, "battle", index)
+
+
+class TournamentStats:
+    # Win/loss/turn counts for some number of battles.
+    def __init__(self):
+        self.battles = 0
+        self.player_wins = 0
+        self.opponent_wins = 0
+        self.undecided = 0 # Hit max_rounds with no winner
+        self.total_rounds = 0
+        self.player_cards_played = 0
+        self.opponent_cards_played = 0
+        self.rounds_histogram = {} # rounds -> number of battles that took that many
+        self.metrics = None # A Metrics, if they were collected
+
+    def add(self, battle):
+        # Count one finished engine.Battle
+        self.battles += 1
+        if battle.winner == "player":
+            self.player_wins += 1
+        elif battle.winner == "opponent":
+            self.opponent_wins += 1
+        else:
+            self.undecided += 1
+        self.total_rounds += battle.round
+        self.player_cards_played += battle.player_cards_played
+        self.opponent_cards_played += battle.opponent_cards_played
+        self.rounds_histogram[battle.round] = self.rounds_histogram.get(battle.round, 0) + 1
+
+    def merge(self, other):
+        # Adds another TournamentStats' counts into this one
+        self.battles += other.battles
+        self.player_wins += other.player_wins
+        self.opponent_wins += other.opponent_wins
+        self.undecided += other.undecided
+        self.total_rounds += other.total_rounds
+        self.player_cards_played += other.player_cards_played
+        self.opponent_cards_played += other.opponent_cards_played
+        for rounds, count in other.rounds_histogram.items():
+            self.rounds_histogram[rounds] = self.rounds_histogram.get(rounds, 0) + count
+        if other.metrics is not None:
+            if self.metrics is None:
+                self.metrics = Metrics()
+            self.metrics.merge(other.metrics)
+        return self
+
+    def asDict(self):
+        return {
+            "battles": self.battles,
+            "player_wins": self.player_wins,
+            "opponent_wins": self.opponent_wins,
+            "undecided": self.undecided,
+            "total_rounds": self.total_rounds,
+            "player_cards_played": self.player_cards_played,
+            "opponent_cards_played": self.opponent_cards_played,
+            # Sorted so the same stats always give the same JSON
+            "rounds_histogram": {str(rounds): self.rounds_histogram[rounds] for rounds in sorted(self.rounds_histogram)},
+        }
+
+    def __str__(self):
+        if self.battles == 0:
+            return "No battles."
+        return "Battles: %i\nPlayer wins: %i (%.2f%%)\nOpponent wins: %i (%.2f%%)\nUndecided: %i\nAverage rounds: %.3f" % (
+            self.battles,
+            self.player_wins, 100.0 * self.player_wins / self.battles,
+            self.opponent_wins, 100.0 * self.opponent_wins / self.battles,
+            self.undecided,
+            self.total_rounds / self.battles)
+
+
+def runShard(seed, start, end, player_policy=engine.playFirstPolicy, opponent_policy=engine.playFirstPolicy, max_rounds=1000, metrics=False):
+    # Runs battles start..end-1 and returns their TournamentStats.
+    # This is what each worker process does.
+    # metrics: also collect Metrics into stats.metrics
+    stats = TournamentStats()
+    if metrics:
+        stats.metrics = Metrics()
+    with collectingMetrics(stats.metrics) if metrics else nullcontext():
+        for index in range(start, end):
+            battle = engine.simulateBattle(core.Player(), core.Player(),
+                player_policy, opponent_policy, battleRandom(seed, index), max_rounds)
+            stats.add(battle)
+    return stats
+
+def makeShards(battles, shard_size):
+    # (start, end) ranges covering 0..battles-1
+    return [(start, min(start + shard_size, battles)) for start in range(0, battles, shard_size)]
+
+def runTournament(battles, seed=0, workers=None, shard_size=1000, player_policy=engine.playFirstPolicy, opponent_policy=engine.playFirstPolicy, max_rounds=1000, metrics=False):
+    # Runs battles battles and returns the merged TournamentStats.
+    # workers is the number of processes (default: one per CPU);
+    # 1 runs everything in this process. Policies have to be module-level
+    # functions so the worker processes can find them.
+    # metrics=True also fills in the stats' metrics (see metrics.py).
+    if workers is None:
+        workers = os.cpu_count() or 1
+    shards = makeShards(battles, shard_size)
+
+    total = TournamentStats()
+    if workers <= 1 or len(shards) <= 1:
+        for start, end in shards:
+            total.merge(runShard(seed, start, end, player_policy, opponent_policy, max_rounds, metrics))
+        return total
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(runShard, seed, start, end, player_policy, opponent_policy, max_rounds, metrics) for start, end in shards]
+        for future in futures:
+            total.merge(future.result())
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run many headless battles and report win/loss/turn statistics.")
+    parser.add_argument("--battles", type=int, default=10000, help="number of battles to run")
+    parser.add_argument("--seed", type=int, default=0, help="tournament seed; the same seed gives the same results")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--shard-size", type=int, default=1000, help="battles per unit of work")
+    parser.add_argument("--max-rounds", type=int, default=1000, help="give up on a battle after this many rounds")
+    parser.add_argument("--json", action="store_true", help="print the statistics as JSON")
+    parser.add_argument("--metrics", choices=("json", "prometheus"), help="also collect effect counters and phase timers, in this format")
+    parser.add_argument("--metrics-file", help="write the metrics here instead of printing them")
+    args = parser.parse_args(argv)
+
+    stats = runTournament(args.battles, args.seed, args.workers, args.shard_size, max_rounds=args.max_rounds, metrics=args.metrics is not None)
+    if args.json:
+        print(json.dumps(stats.asDict(), indent=2))
+    else:
+        print(stats)
+
+    if args.metrics is not None:
+        text = stats.metrics.toJSON() + "\n" if args.metrics == "json" else stats.metrics.toPrometheus()
+        if args.metrics_file:
+            with open(args.metrics_file, "w") as metrics_file:
+                metrics_file.write(text)
+        else:
+            print(text, end="")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,245 @@
+# Runs lots of battles at once with NumPy.
+# Instead of a pair of Player objects per battle, every stat is an array
+# with one column per battle, and each step plays one card in every
+# battle that is still going. Needs numpy (pip install numpy).
+
+# The rules are the same as Battle/simulateBattle in engine.py with
+# playFirstPolicy on both sides. Playing the hand in the order it was drawn
+# is the same as drawing each card right before it's played, so cards are
+# drawn one step at a time here.
+
+import numpy as np
+
+from randomcards import core
+
+# Player stats kept for every battle, in Player's own names.
+FIELDS = core.PLAYER_FIELDS
+
+# Values for VectorBattles.winner
+NO_WINNER = 0
+PLAYER_WON = 1
+OPPONENT_WON = 2
+
+
+def buildArrayColumns(content):
+    # The slot columns from core.buildSlotColumns() as NumPy arrays:
+    # (effect codes, powers, costs) per table, codes and powers shaped (3, rows).
+    columns = []
+    for codes, powers, costs in content.derived("slot_columns", core.buildSlotColumns):
+        columns.append((np.array(codes, dtype=np.int8), np.array(powers, dtype=np.int64), np.array(costs, dtype=np.int64)))
+    return tuple(columns)
+
+def buildArrayAliasTables(content):
+    # core.buildAliasTables() with the thresholds and aliases as NumPy arrays
+    tables = []
+    for table in content.derived("alias_tables", core.buildAliasTables):
+        if table is not None:
+            table = (table.span, table.total, np.array(table.thresholds, dtype=np.int64), np.array(table.aliases, dtype=np.int64))
+        tables.append(table)
+    return tuple(tables)
+
+def drawCards(rng, count, content=None):
+    # Draws count random cards, each slot picked like CardMakerRandom()
+    # (uniformly, or by weight for tables that have weights).
+    # Returns (codes, powers, costs): codes and powers are shaped (15, count)
+    # in the same order as Card.effects, costs is shaped (count,).
+    if content is None:
+        content = core.getContent()
+    columns = content.derived("array_columns", buildArrayColumns)
+    alias_tables = content.derived("array_alias_tables", buildArrayAliasTables)
+
+    codes = np.empty((15, count), dtype=np.int8)
+    powers = np.empty((15, count), dtype=np.int64)
+    costs = np.zeros(count, dtype=np.int64)
+    for s, size in enumerate(content.sizes):
+        if alias_tables[s] is None:
+            picks = rng.integers(0, size, count)
+        else:
+            span, total, thresholds, aliases = alias_tables[s]
+            columns_picked, units = np.divmod(rng.integers(0, span, count), total)
+            picks = np.where(units < thresholds[columns_picked], columns_picked, aliases[columns_picked])
+        table_codes, table_powers, table_costs = columns[s]
+        codes[3 * s:3 * s + 3] = table_codes[:, picks]
+        powers[3 * s:3 * s + 3] = table_powers[:, picks]
+        costs += table_costs[picks]
+    return codes, powers, costs
+
+
+# VECTOR EFFECTS
+# Same as the effect functions in core.py, but for many battles at
+# once. sim is the VectorBattles, power holds one power per battle in b,
+# and u/t say which side (0 player, 1 opponent) is the user/target in each.
+
+# 1: Damage
+def vectorDamage(sim, power, b, u, t):
+    # Defense soaks up as much of the damage as it can, the rest goes to health.
+    # No defense (or less than none) soaks up nothing.
+    damage_amount = np.maximum(0, power + sim.buff_damage[u, b])
+    defense = sim.defense[t, b]
+    absorbed = np.where(defense <= 0, 0, np.minimum(defense, damage_amount))
+    sim.defense[t, b] = defense - absorbed
+    sim.health[t, b] -= damage_amount - absorbed
+
+# 2: Defense
+def vectorDefense(sim, power, b, u, t):
+    sim.defense[u, b] += np.maximum(0, power + sim.buff_defense[u, b])
+
+# 3: Healing
+def vectorHealing(sim, power, b, u, t):
+    sim.health[u, b] += np.maximum(0, power + sim.buff_healing[u, b])
+
+# 4: Boost Energy
+def vectorBoostEnergy(sim, power, b, u, t):
+    sim.energy[u, b] += np.maximum(0, power + sim.buff_energy[u, b])
+
+# 5: Boost Deck
+def vectorBoostDeck(sim, power, b, u, t):
+    sim.deck[u, b] += np.maximum(0, power + sim.buff_deck[u, b])
+
+# 6: Reduce Energy
+def vectorReduceEnergy(sim, power, b, u, t):
+    sim.energy[t, b] -= np.maximum(0, power + sim.buff_energy[u, b])
+
+# 7: Reduce Deck
+def vectorReduceDeck(sim, power, b, u, t):
+    sim.deck[t, b] -= np.maximum(0, power + sim.buff_deck[u, b])
+
+# 8-12: Debuffs lower the target's buff by the power
+def vectorDebuff(field):
+    def debuff(sim, power, b, u, t):
+        getattr(sim, field)[t, b] -= power
+    return debuff
+
+# 13-17: Buffs raise the user's buff by the power
+def vectorBuff(field):
+    def buff(sim, power, b, u, t):
+        getattr(sim, field)[u, b] += power
+    return buff
+
+# Index i holds the function for effect code i (see core.EFFECT_NAMES).
+VECTOR_EFFECTS = (
+    None, vectorDamage, vectorDefense, vectorHealing, vectorBoostEnergy,
+    vectorBoostDeck, vectorReduceEnergy, vectorReduceDeck,
+    vectorDebuff("buff_damage"), vectorDebuff("buff_defense"),
+    vectorDebuff("buff_healing"), vectorDebuff("buff_energy"),
+    vectorDebuff("buff_deck"), vectorBuff("buff_damage"),
+    vectorBuff("buff_defense"), vectorBuff("buff_healing"),
+    vectorBuff("buff_energy"), vectorBuff("buff_deck"),
+)
+
+
+class VectorBattles:
+    # n battles between copies of player and opponent (Player objects used
+    # as starting stats; default Player() for both), played in lockstep.
+    # Every stat in FIELDS is an array shaped (2, n): [0] is the player's
+    # side of each battle, [1] the opponent's.
+    def __init__(self, n, rng=None, player=None, opponent=None, max_rounds=1000):
+        if rng is None or isinstance(rng, (int, np.random.SeedSequence)):
+            rng = np.random.default_rng(rng)
+        if player is None:
+            player = core.Player()
+        if opponent is None:
+            opponent = core.Player()
+
+        self.n = n
+        self.rng = rng # A numpy Generator
+        self.max_rounds = max_rounds # None lets battles go on forever
+        self.content = core.getContent()
+
+        for field in FIELDS:
+            start = np.array([getattr(player, field), getattr(opponent, field)], dtype=np.int64)
+            setattr(self, field, np.repeat(start[:, None], n, axis=1))
+
+        # Per battle turn state, like the attributes of engine.Battle
+        self.side = np.zeros(n, dtype=np.int64) # Whose turn: 0 player, 1 opponent
+        self.hand_left = np.zeros(n, dtype=np.int64) # Cards left in hand this turn
+        self.plays_this_turn = np.zeros(n, dtype=np.int64)
+        self.round = np.zeros(n, dtype=np.int64)
+        self.cards_played = np.zeros((2, n), dtype=np.int64)
+        self.winner = np.full(n, NO_WINNER, dtype=np.int8)
+        self.live = np.ones(n, dtype=bool) # False once a battle is over
+
+        # Energy carries over between turns, starting from nothing
+        self.energy_current[:] = 0
+        self.beginTurn(np.arange(n))
+
+    def beginTurn(self, b):
+        # Starts the turn of whoever's side it is in battles b.
+        u = self.side[b]
+        players = b[u == 0]
+        if self.max_rounds is not None:
+            # Out of rounds: stop before the player's next turn, with no winner
+            capped = self.round[players] >= self.max_rounds
+            self.live[players[capped]] = False
+            players = players[~capped]
+        self.round[players] += 1
+
+        self.defense[u, b] = 0 # Defense only lasts one turn
+        self.energy_current[u, b] += self.energy[u, b]
+        self.hand_left[b] = np.maximum(self.deck[u, b], 0)
+        self.plays_this_turn[b] = 0
+
+    def endTurn(self, b):
+        # Only the side that just played can win, same as Battle.endTurn()
+        u = self.side[b]
+        t = 1 - u
+        defeated = (self.health[t, b] <= 0) | (self.energy[t, b] <= 0) | (self.deck[t, b] <= 0)
+        done = b[defeated]
+        self.winner[done] = np.where(u[defeated] == 0, PLAYER_WON, OPPONENT_WON)
+        self.live[done] = False
+
+        going = b[~defeated]
+        self.side[going] = 1 - self.side[going]
+        self.beginTurn(going)
+
+    def playCards(self, b, codes, powers, costs):
+        # Plays one card in each of battles b. codes and powers are shaped
+        # (15, len(b)) and go in order, so earlier buffs count for later damage.
+        u = self.side[b]
+        t = 1 - u
+        for k in range(15):
+            code = codes[k]
+            used = np.flatnonzero(code)
+            if used.size == 0:
+                continue
+            for c in np.unique(code[used]):
+                sel = used[code[used] == c]
+                VECTOR_EFFECTS[c](self, powers[k, sel], b[sel], u[sel], t[sel])
+
+        self.energy_current[u, b] -= costs
+        self.hand_left[b] -= 1
+        self.plays_this_turn[b] += 1
+        self.cards_played[u, b] += 1
+
+    def step(self):
+        # One card (or the end of a turn) in every live battle.
+        # Returns how many battles are still going.
+        b = np.flatnonzero(self.live)
+        if b.size == 0:
+            return 0
+        u = self.side[b]
+
+        # The first card of a turn can always be played; after that the
+        # turn ends once energy or cards run out.
+        can_play = (self.hand_left[b] > 0) & ((self.plays_this_turn[b] == 0) | (self.energy_current[u, b] > 0))
+
+        playing = b[can_play]
+        if playing.size:
+            codes, powers, costs = drawCards(self.rng, playing.size, self.content)
+            self.playCards(playing, codes, powers, costs)
+
+        ending = b[~can_play]
+        if ending.size:
+            self.endTurn(ending)
+
+        return int(np.count_nonzero(self.live))
+
+    def run(self):
+        while self.step():
+            pass
+        return self
+
+def simulateBattles(n, rng=None, player=None, opponent=None, max_rounds=1000):
+    # Runs n battles to the end and returns the finished VectorBattles.
+    # rng is a numpy Generator, or a seed for one.
+    return VectorBattles(n, rng, player, opponent, max_rounds).run()